@@ -0,0 +1,196 @@
+import os
+import tkinter as tk
+from functools import partial
+from tkinter import filedialog, messagebox, ttk
+from StegApi import check_hidden_data, clean_hidden_data, revive_image, list_images, revive_images, \
+    REVIVE_COMPRESS_LEVEL
+from StegBatch import default_workers
+from StegCache import ResultCache
+from StegGui import BatchRunner, append_console
+from StegTiming import timed
+
+
+# Console colors for the different types of messages (any other type keeps the default limegreen)
+MESSAGE_COLORS = {"info": "cyan", "error": "red", "success": "green"}
+
+
+# Log output to the console with colors for different types of messages.
+# messages is a batch of (message, message_type, image_name); the type is the tag that colors the line.
+@timed("console")
+def log_to_console(console, messages):
+    append_console(console, [(f"{image_name}: {message}\n", (message_type,))
+                             for message, message_type, image_name in messages])
+
+
+# GUI Application class for ImgRevive
+class ImgReviveApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("ImgRevive Tool")
+        self.root.configure(bg="black")
+        self.root.resizable(False, False)  # Fixed window size
+
+        # Paths
+        self.input_images_path = tk.StringVar()
+        self.output_images_path = tk.StringVar()
+        self.legacy_scan = tk.BooleanVar(value=True)  # Also look for old EOF-marker messages
+        self.workers = tk.IntVar(value=default_workers())  # Worker processes used for the batch
+        self.cache_path = tk.StringVar()  # Optional result cache, unchanged images are skipped on re-runs
+        self.payload_rows_only = tk.BooleanVar(value=False)  # Clean only the rows that carry the payload
+        self.compress_level = tk.IntVar(value=REVIVE_COMPRESS_LEVEL)  # PNG compression level of the cleaned images (0-9)
+
+        # GUI layout
+        self.create_widgets()
+
+    def create_widgets(self):
+        tk.Label(self.root, text="Input Images Folder Path:", bg="black", fg="limegreen").grid(row=0, column=0, padx=10,
+                                                                                               pady=5, sticky='w')
+        tk.Entry(self.root, textvariable=self.input_images_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen").grid(row=0, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_input_folder, bg="black", fg="limegreen").grid(row=0,
+                                                                                                               column=2,
+                                                                                                               padx=10,
+                                                                                                               pady=5)
+
+        tk.Label(self.root, text="Output Images Folder Path:", bg="black", fg="limegreen").grid(row=1, column=0,
+                                                                                                padx=10, pady=5,
+                                                                                                sticky='w')
+        tk.Entry(self.root, textvariable=self.output_images_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen").grid(row=1, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_output_folder, bg="black", fg="limegreen").grid(row=1,
+                                                                                                                column=2,
+                                                                                                                padx=10,
+                                                                                                                pady=5)
+
+        tk.Checkbutton(self.root, text="Scan for legacy EOF-marker messages (slower on clean images)",
+                       variable=self.legacy_scan, bg="black", fg="limegreen", selectcolor="black",
+                       activebackground="black", activeforeground="limegreen").grid(row=2, column=0, columnspan=3,
+                                                                                    padx=10, pady=5, sticky='w')
+
+        tk.Label(self.root, text="Worker Processes:", bg="black", fg="limegreen").grid(row=3, column=0, padx=10,
+                                                                                       pady=5, sticky='w')
+        tk.Entry(self.root, textvariable=self.workers, width=10, bg="black", fg="limegreen",
+                 insertbackground="limegreen").grid(row=3, column=1, padx=10, pady=5, sticky='w')
+
+        tk.Label(self.root, text="Result Cache (optional):", bg="black", fg="limegreen").grid(row=4, column=0, padx=10,
+                                                                                              pady=5, sticky='w')
+        tk.Entry(self.root, textvariable=self.cache_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen").grid(row=4, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_cache, bg="black", fg="limegreen").grid(row=4,
+                                                                                                        column=2,
+                                                                                                        padx=10,
+                                                                                                        pady=5)
+
+        tk.Checkbutton(self.root, text="Clean only the rows that carry the payload",
+                       variable=self.payload_rows_only, bg="black", fg="limegreen", selectcolor="black",
+                       activebackground="black", activeforeground="limegreen").grid(row=5, column=0, columnspan=3,
+                                                                                    padx=10, pady=5, sticky='w')
+
+        tk.Label(self.root, text="PNG Compression Level (0-9):", bg="black", fg="limegreen").grid(row=6, column=0,
+                                                                                                  padx=10, pady=5,
+                                                                                                  sticky='w')
+        tk.Spinbox(self.root, from_=0, to=9, textvariable=self.compress_level, width=5, bg="black", fg="limegreen",
+                   insertbackground="limegreen").grid(row=6, column=1, padx=10, pady=5, sticky='w')
+
+        self.console = tk.Text(self.root, height=15, width=80, state='disabled', bg='black', fg='limegreen',
+                               font=("Courier", 12))
+        self.console.grid(row=7, column=0, columnspan=3, padx=10, pady=10, sticky='ew')
+        for message_type, color in MESSAGE_COLORS.items():
+            self.console.tag_configure(message_type, foreground=color)
+
+        self.progress = ttk.Progressbar(self.root, orient='horizontal', mode='determinate', length=400)
+        self.progress.grid(row=8, column=0, columnspan=3, padx=10, pady=10)
+
+        self.start_button = tk.Button(self.root, text="Start Revive Process", command=self.start_revive, bg="black",
+                                      fg="limegreen")
+        self.start_button.grid(row=9, column=1, pady=10)
+        self.cancel_button = tk.Button(self.root, text="Cancel", bg="black", fg="limegreen", state='disabled')
+        self.cancel_button.grid(row=9, column=2, pady=10)
+        self.runner = BatchRunner(self.root, self.start_button, self.cancel_button, self.progress, "Revive process",
+                                  cancelled_title="Revive Process Cancelled", complete_title="Revive Process Complete",
+                                  complete_message="Revive process complete! Images saved to the output folder.")
+
+    def browse_input_folder(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.input_images_path.set(path)
+
+    def browse_output_folder(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.output_images_path.set(path)
+
+    def browse_cache(self):
+        path = filedialog.asksaveasfilename(defaultextension=".sqlite", filetypes=[("SQLite files", "*.sqlite")],
+                                            confirmoverwrite=False)
+        if path:
+            self.cache_path.set(path)
+
+    def start_revive(self):
+        input_folder = self.input_images_path.get()
+        output_folder = self.output_images_path.get()
+        legacy_scan = self.legacy_scan.get()
+        workers = self.workers.get()
+        cache_path = self.cache_path.get()
+        payload_rows_only = self.payload_rows_only.get()
+        compress_level = self.compress_level.get()
+
+        if not os.path.isdir(input_folder):
+            messagebox.showerror("Error", "Invalid input folder path.")
+            return
+
+        if not os.path.isdir(output_folder):
+            messagebox.showerror("Error", "Invalid output folder path.")
+            return
+
+        if not 0 <= compress_level <= 9:
+            messagebox.showerror("Error", "PNG compression level must be between 0 and 9.")
+            return
+
+        images = list_images(input_folder)
+        self.progress['maximum'] = len(images)
+        self.progress['value'] = 0
+
+        # The batch runs in the background; the window keeps responding and can cancel it
+        work = partial(self.revive, input_folder=input_folder, output_folder=output_folder, legacy_scan=legacy_scan,
+                       workers=workers, cache_path=cache_path, payload_rows_only=payload_rows_only,
+                       compress_level=compress_level, images=images)
+        self.runner.start(work, self.show_rows, workers)
+
+    # Runs on the batch thread
+    def revive(self, post, cancelled, input_folder, output_folder, legacy_scan, workers, cache_path,
+               payload_rows_only, compress_level, images):
+        # The cache is opened here, SQLite connections stay on the thread that opened them
+        cache = ResultCache(cache_path) if cache_path else None
+        try:
+            rows = revive_images(input_folder, output_folder, legacy_scan, workers, images, cache, payload_rows_only,
+                                 compress_level)
+            for row in rows:
+                post(row)
+                if cancelled():
+                    rows.close()  # Images not started yet are dropped
+                    break
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def show_rows(self, rows):
+        messages = []
+        for row in rows:
+            image_name = row["image"]
+            if row["error"]:
+                messages.append((f"Failed to process {image_name}: {row['error']}", "error", image_name))
+            elif row["hidden_data"]:
+                messages.append((f"Hidden data found in {image_name}: {row['hidden_data']}", "info", image_name))
+                messages.append((f"Hidden data cleaned and image saved as {row['output']}", "success", image_name))
+            else:
+                messages.append((f"No hidden data in {image_name}", "info", image_name))
+        log_to_console(self.console, messages)
+        self.progress['value'] += len(rows)
+
+
+# Main
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = ImgReviveApp(root)
+    root.mainloop()
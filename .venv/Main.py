@@ -0,0 +1,85 @@
+import tkinter as tk
+from tkinter import messagebox
+import os
+import subprocess
+import sys
+
+# Milliseconds between two checks on a launched script
+SCRIPT_POLL_MS = 500
+
+# GUI Application class
+class WelcomeApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Welcome to StegApp")  # Set the title
+        self.root.configure(bg="black")  # Dark background
+        self.root.resizable(False, False)  # Fixed window size
+
+        # GUI layout
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Smiley face with text above the buttons
+        tk.Label(self.root, text="😊 Welcome to Cypher StegApp! 😊", bg="black", fg="limegreen", font=("Courier", 16)).grid(row=0, column=0, columnspan=3, pady=20)
+
+        # Welcome label with warm messages
+        tk.Label(self.root, text="Here's all about LSB in Img!", bg="black", fg="limegreen", font=("Courier", 24, "bold")).grid(row=1,
+                                                                                                                       column=0,
+                                                                                                                       columnspan=3,
+                                                                                                                       pady=20)
+
+        tk.Label(self.root, text="Hello! What would you like to do today?", bg="black", fg="limegreen", font=("Courier", 16)).grid(row=2,
+                                                                                                                            column=0,
+                                                                                                                            columnspan=3,
+                                                                                                                            pady=10)
+
+        # Buttons for StegMake, StegAnalyze, and ImgRevive
+        tk.Button(self.root, text="StegMake", command=self.run_stegmake, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Courier", 14), width=20).grid(row=3, column=0, pady=20)
+
+        tk.Button(self.root, text="StegAnalyze", command=self.run_steganalyze, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Courier", 14), width=20).grid(row=3, column=1, pady=20)
+
+        tk.Button(self.root, text="ImgRevive", command=self.run_imgrevive, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Courier", 14), width=20).grid(row=3, column=2, pady=20)
+
+        # Copyright Notice at the bottom of the window
+        tk.Label(self.root, text="© AmrAhmedSanad 2024. All rights reserved.", bg="black", fg="limegreen", font=("Courier", 10)).grid(row=4, column=0, columnspan=3, pady=20)
+
+    # Function to run StegMake
+    def run_stegmake(self):
+        self.run_script("StegMake.py")
+
+    # Function to run StegAnalyze
+    def run_steganalyze(self):
+        self.run_script("StegAnalyze.py")
+
+    # Function to run ImgRevive
+    def run_imgrevive(self):
+        self.run_script("ImgRevive.py")
+
+    # Function to run Python scripts without blocking the launcher (failures are reported when the script exits)
+    def run_script(self, script_name):
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script_name)
+        if not os.path.exists(script_path):
+            messagebox.showerror("Error", f"{script_name} not found. Please ensure the script is in the same directory.")
+            return
+        try:
+            process = subprocess.Popen([sys.executable, script_path], cwd=os.path.dirname(script_path))
+        except Exception as e:
+            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+            return
+        self.root.after(SCRIPT_POLL_MS, self.watch_script, process, script_name)
+
+    # Function to check on a launched script until it exits
+    def watch_script(self, process, script_name):
+        if process.poll() is None:
+            self.root.after(SCRIPT_POLL_MS, self.watch_script, process, script_name)
+        elif process.returncode != 0:
+            messagebox.showerror("Error", f"{script_name} exited with an error (code {process.returncode}).")
+
+# Main
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = WelcomeApp(root)
+    root.mainloop()
@@ -0,0 +1,200 @@
+import os
+import tkinter as tk
+from functools import partial
+from tkinter import filedialog, ttk, messagebox
+from StegApi import sanitize_text, extract_text_from_image, is_clear, list_images, analyze_images, ReportWriter, \
+    ANALYZE_COLUMNS, ANALYZE_SCREEN_COLUMNS
+from StegScreen import SAMPLE_PIXELS
+from StegBatch import default_workers
+from StegCache import ResultCache
+from StegGui import BatchRunner, append_console
+from StegTiming import timed
+
+
+# GUI Application class
+class SteganographyApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("StegAnalyze")  # Set the title to "StegAnalyze"
+        self.root.configure(bg="black")  # Dark background
+        self.root.resizable(False, False)  # Fixed window size
+
+        # Paths
+        self.images_path = tk.StringVar()
+        self.excel_path = tk.StringVar()
+        self.legacy_scan = tk.BooleanVar(value=True)  # Also look for old EOF-marker messages
+        self.workers = tk.IntVar(value=default_workers())  # Worker processes used for the batch
+        self.cache_path = tk.StringVar()  # Optional result cache, unchanged images are skipped on re-runs
+        self.screen = tk.BooleanVar(value=False)  # Statistical pre-screen before the full extraction
+        self.sample_pixels = tk.IntVar(value=SAMPLE_PIXELS)  # Pixels sampled by the pre-screen
+
+        # GUI layout
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Title label with hacker-style font
+        tk.Label(self.root, text="StegAnalyze", bg="black", fg="limegreen", font=("Anonymous Pro", 24, "bold")).grid(
+            row=0,
+            column=0,
+            columnspan=3,
+            pady=20)
+
+        tk.Label(self.root, text="Path to Images:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=1,
+                                                                                                                 column=0,
+                                                                                                                 padx=10,
+                                                                                                                 pady=5,
+                                                                                                                 sticky='w')
+        tk.Entry(self.root, textvariable=self.images_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=1, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_images, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=1, column=2, padx=10, pady=5)
+
+        tk.Label(self.root, text="Excel File Path:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=2,
+                                                                                                                  column=0,
+                                                                                                                  padx=10,
+                                                                                                                  pady=5,
+                                                                                                                  sticky='w')
+        tk.Entry(self.root, textvariable=self.excel_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=2, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_excel, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=2, column=2, padx=10, pady=5)
+
+        tk.Checkbutton(self.root, text="Scan for legacy EOF-marker messages (slower on clean images)",
+                       variable=self.legacy_scan, bg="black", fg="limegreen", selectcolor="black",
+                       activebackground="black", activeforeground="limegreen",
+                       font=("Anonymous Pro", 12)).grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='w')
+
+        tk.Label(self.root, text="Worker Processes:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=4,
+                                                                                                                   column=0,
+                                                                                                                   padx=10,
+                                                                                                                   pady=5,
+                                                                                                                   sticky='w')
+        tk.Entry(self.root, textvariable=self.workers, width=10, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=4, column=1, padx=10, pady=5,
+                                                                                sticky='w')
+
+        tk.Label(self.root, text="Result Cache (optional):", bg="black", fg="limegreen",
+                 font=("Anonymous Pro", 12)).grid(row=5, column=0, padx=10, pady=5, sticky='w')
+        tk.Entry(self.root, textvariable=self.cache_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=5, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_cache, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=5, column=2, padx=10, pady=5)
+
+        tk.Checkbutton(self.root, text="Statistical pre-screen (full extraction only for suspicious images)",
+                       variable=self.screen, bg="black", fg="limegreen", selectcolor="black",
+                       activebackground="black", activeforeground="limegreen",
+                       font=("Anonymous Pro", 12)).grid(row=6, column=0, columnspan=3, padx=10, pady=5, sticky='w')
+
+        tk.Label(self.root, text="Pre-screen Sample (pixels):", bg="black", fg="limegreen",
+                 font=("Anonymous Pro", 12)).grid(row=7, column=0, padx=10, pady=5, sticky='w')
+        tk.Entry(self.root, textvariable=self.sample_pixels, width=10, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=7, column=1, padx=10, pady=5,
+                                                                                sticky='w')
+
+        self.console = tk.Text(self.root, height=10, state='disabled', bg='black', fg='limegreen',
+                               font=("Courier", 12))  # Changed font to Courier
+        self.console.grid(row=8, column=0, columnspan=3, padx=10, pady=10, sticky='ew')
+
+        self.progress = ttk.Progressbar(self.root, orient='horizontal', mode='determinate', length=400)
+        self.progress.grid(row=9, column=0, columnspan=3, padx=10, pady=10)
+
+        self.start_button = tk.Button(self.root, text="Start", command=self.start_processing, bg="black",
+                                      fg="limegreen", relief="raised", bd=3, font=("Anonymous Pro", 12))
+        self.start_button.grid(row=10, column=1, pady=10)
+        self.cancel_button = tk.Button(self.root, text="Cancel", bg="black", fg="limegreen", relief="raised", bd=3,
+                                       font=("Anonymous Pro", 12), state='disabled')
+        self.cancel_button.grid(row=10, column=2, pady=10)
+        self.runner = BatchRunner(self.root, self.start_button, self.cancel_button, self.progress, "Analysis")
+
+    def browse_images(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.images_path.set(path)
+
+    def browse_excel(self):
+        path = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"),
+                                                       ("JSON Lines files", "*.jsonl")])
+        if path:
+            self.excel_path.set(path)
+
+    def browse_cache(self):
+        path = filedialog.asksaveasfilename(defaultextension=".sqlite", filetypes=[("SQLite files", "*.sqlite")],
+                                            confirmoverwrite=False)
+        if path:
+            self.cache_path.set(path)
+
+    @timed("console")
+    def log_to_console(self, messages):
+        append_console(self.console, [(message + "\n\n", ()) for message in messages])  # Empty line after every message
+
+    def start_processing(self):
+        images_path = self.images_path.get()
+        excel_path = self.excel_path.get()
+        legacy_scan = self.legacy_scan.get()
+        workers = self.workers.get()
+        cache_path = self.cache_path.get()
+        screen = self.screen.get()
+        sample_pixels = self.sample_pixels.get()
+
+        if not os.path.isdir(images_path):
+            messagebox.showerror("Error", "Invalid images folder path.")
+            return
+
+        if not excel_path:
+            messagebox.showerror("Error", "Invalid Excel file path.")
+            return
+
+        if screen and sample_pixels < 1:
+            messagebox.showerror("Error", "Pre-screen sample must be at least one pixel.")
+            return
+
+        images = list_images(images_path)
+        self.progress['maximum'] = len(images)
+        self.progress['value'] = 0
+
+        # The batch runs in the background; the window keeps responding and can cancel it
+        work = partial(self.process, images_path=images_path, excel_path=excel_path, legacy_scan=legacy_scan,
+                       workers=workers, cache_path=cache_path, screen=screen, sample_pixels=sample_pixels,
+                       images=images)
+        self.runner.start(work, self.show_rows, workers)
+
+    # Runs on the batch thread: report rows are streamed to the Excel (or CSV / JSON Lines) file as images complete;
+    # Excel statuses are green if clear, red if there is hidden text, yellow if the pre-screen finds the image
+    # suspicious and orange if the image couldn't be read
+    def process(self, post, cancelled, images_path, excel_path, legacy_scan, workers, cache_path, screen,
+                sample_pixels, images):
+        # The cache is opened here, SQLite connections stay on the thread that opened them
+        cache = ResultCache(cache_path) if cache_path else None
+        try:
+            with ReportWriter(excel_path, ANALYZE_SCREEN_COLUMNS if screen else ANALYZE_COLUMNS) as report:
+                rows = analyze_images(images_path, legacy_scan, workers, images, cache, screen, sample_pixels)
+                for row in rows:
+                    report.write(row)
+                    post(row)
+                    if cancelled():
+                        rows.close()  # Images not started yet are dropped
+                        break
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def show_rows(self, rows):
+        messages = []
+        for row in rows:
+            if row["error"]:
+                messages.append(f"Failed: {row['image']}, Error: {row['error']}")
+            elif row["score"] is not None:
+                messages.append(f"Processed: {row['image']}, Score: {row['score']:.2f}, "
+                                f"Extracted Text: {row['text'] or 'No hidden text'}")
+            else:
+                messages.append(f"Processed: {row['image']}, Extracted Text: {row['text'] or 'No hidden text'}")
+        self.log_to_console(messages)
+        self.progress['value'] += len(rows)
+
+
+# Main
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = SteganographyApp(root)
+    root.mainloop()
@@ -0,0 +1,426 @@
+import csv
+import json
+import os
+import random
+import re
+import string
+import sys
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import PatternFill
+from StegCore import load_rgb, load_rgb_keep_alpha, payload_to_bits, embed_bits, read_red_lsb, read_payload, \
+    parse_payload, split_eof_marker, find_eof_marker, bits_to_bytes, clear_red_lsb, file_decodes_by_rows, \
+    HEADER_BITS, EOF_MARKER
+from StegBatch import run_batch
+from StegCache import file_digest
+from StegScreen import screen_image, screen_rgb, SAMPLE_PIXELS, SUSPICIOUS_SCORE
+from StegStrips import open_strips, can_write_strips, read_payload_strips, scan_eof_marker_strips, rewrite_strips, \
+    STRIP_MIN_PIXELS
+from StegTiming import timed
+
+# File types picked up from the input folders
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg')
+
+# Length of the random text StegMake hides in every image
+HIDDEN_TEXT_LENGTH = 20
+
+# PNG compression level of the images cleaned by ImgRevive. Encoding dominates the cost of cleaning: level 1 cleans
+# a dirty 12 MP PNG about 5x faster than Pillow's default of 6, for files about 20% larger
+REVIVE_COMPRESS_LEVEL = 1
+
+# Report columns as (header, row key) pairs
+MAKE_COLUMNS = [("Image Name", "image"), ("Hidden Message", "hidden_text")]
+ANALYZE_COLUMNS = [("Image Name", "image"), ("Status", "status")]
+ANALYZE_SCREEN_COLUMNS = ANALYZE_COLUMNS + [("Score", "score")]
+REVIVE_COLUMNS = [("Image Name", "image"), ("Hidden Data", "hidden_data"), ("Output Image", "output")]
+
+# Excel fills for the status column of a report row, by verdict
+VERDICT_FILLS = {
+    "clear": PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid"),
+    "hidden": PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid"),
+    "suspicious": PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"),
+    "error": PatternFill(start_color="FFA500", end_color="FFA500", fill_type="solid"),
+}
+
+
+# Function to hide text in an image using LSB steganography
+def hide_text_in_image(image_path, text, output_path):
+    binary_text = payload_to_bits(text)  # Header (magic, length, checksum) followed by the text
+
+    # Large PNGs are copied strip by strip, with the same output bytes
+    strips = open_strips(image_path)
+    if strips is not None and can_write_strips(output_path):
+        with strips:
+            check_capacity(image_path, strips.size, binary_text, text)
+            rewrite_strips(strips, output_path, 'RGB', bits=binary_text)
+        return
+
+    image = load_rgb(image_path)
+    check_capacity(image_path, image.size, binary_text, text)
+    embed_bits(image, binary_text)
+    save_image(image, output_path)
+
+
+# Function to make sure an image has a pixel for every bit of the payload
+def check_capacity(image_path, size, binary_text, text):
+    width, height = size
+    if len(binary_text) > width * height:
+        raise ValueError(f"{os.path.basename(image_path)} is too small to hold {len(text)} characters.")
+
+
+# Function to sanitize the extracted text (remove any illegal characters)
+def sanitize_text(text):
+    # Remove any non-printable characters or control characters
+    return re.sub(r'[^\x20-\x7E]', '', text)
+
+
+# Function to look for hidden data with as few decodes as the image format allows.
+# Returns the header-format payload (or None) and, when legacy is set and there is no payload, the
+# (data, tail, found) result of the legacy EOF-marker scan (see split_eof_marker).
+def find_hidden_data(image_path, legacy=True):
+    strips = open_strips(image_path, min_pixels=0)
+    if strips is not None:
+        with strips:
+            # Header-format payloads only need the pixels that carry them
+            width, height = strips.size
+            payload = read_payload_strips(strips) if width * height >= STRIP_MIN_PIXELS else read_payload(image_path)
+            if payload is not None or not legacy:
+                return payload, None
+
+            # The EOF marker scan streams the image once and stops at the marker
+            return None, scan_eof_marker_strips(strips)
+
+    if not legacy:
+        return read_payload(image_path), None
+
+    # Other formats are decoded once, and both checks run on the same bit plane
+    return find_hidden_data_in_bits(read_red_lsb(load_rgb(image_path)), legacy)
+
+
+# Function to look for hidden data in an already decoded bit plane (same results as find_hidden_data)
+def find_hidden_data_in_bits(bits, legacy=True):
+    payload = parse_payload(bits)
+    if payload is not None or not legacy:
+        return payload, None
+    return None, split_eof_marker(bits)
+
+
+# Function to extract hidden text from an image using LSB steganography
+def extract_text_from_image(image_path, legacy=True):
+    payload, legacy_scan = find_hidden_data(image_path, legacy)
+    return hidden_text(payload, legacy_scan)
+
+
+# Function to turn the result of find_hidden_data into sanitized text ("" when nothing was found)
+def hidden_text(payload, legacy_scan):
+    if payload is not None:
+        return sanitize_text(payload.decode('utf-8', 'replace'))
+
+    if legacy_scan is None:
+        return ""
+
+    # Everything before the EOF marker left by older versions of StegMake, or the whole image when there is none
+    # (a trailing partial byte is dropped)
+    data, _, _ = legacy_scan
+    return sanitize_text(data.decode('latin-1'))
+
+
+# Function to determine if the extracted text is clear or contains hidden data
+def is_clear(extracted_text):
+    # If the extracted text is empty, or if it consists of non-printable characters, it's considered clear
+    if not extracted_text or len(extracted_text.strip()) == 0:
+        return True
+    return False
+
+
+# Function to extract hidden message from an image using LSB steganography
+def check_hidden_data(image_path, legacy=True):
+    payload, legacy_scan = find_hidden_data(image_path, legacy)
+    if payload is not None:
+        return payload.decode('utf-8', 'replace')
+
+    # Only a message followed by the EOF marker (binary '1111111111111110') left by older versions of StegMake counts
+    if legacy_scan is None or not legacy_scan[2]:
+        return None
+    data, tail, _ = legacy_scan
+    return legacy_text(data, tail)
+
+
+# Function to turn the bits before a legacy EOF marker into the hidden message
+def legacy_message(binary_message):
+    return legacy_text(bits_to_bytes(binary_message), binary_message[len(binary_message) - len(binary_message) % 8:])
+
+
+# Function to turn the bytes before a legacy EOF marker, and the bits of a trailing partial byte, into the message
+def legacy_text(data, tail):
+    hidden_message = data.decode('latin-1')
+    if len(tail):
+        # A trailing partial byte is read as a short binary number
+        hidden_message += chr(int(''.join(map(str, tail)), 2))
+    return hidden_message
+
+
+# Function to save an output image (compress_level only applies to PNG output)
+@timed("encode")
+def save_image(image, output_path, compress_level=None):
+    if compress_level is None:
+        image.save(output_path)
+    else:
+        image.save(output_path, compress_level=compress_level)
+
+
+# Function to triage an image with the statistical pre-screen and only run the full extraction when it's suspicious.
+# Header-format payloads are exact and cheap to read, so they're always checked.
+def screen_and_extract(image_path, legacy=True, sample_pixels=SAMPLE_PIXELS, threshold=SUSPICIOUS_SCORE):
+    if file_decodes_by_rows(image_path):
+        # The screen and the header only decode the top rows, so clean images cost the sample, not the resolution
+        score, _ = screen_image(image_path, sample_pixels)
+        payload, legacy_scan = find_hidden_data(image_path, legacy and score >= threshold)
+    else:
+        # Other formats (JPEG) always decode the full frame: it is decoded once, for the screen and both checks
+        image = load_rgb(image_path)
+        score, _ = screen_rgb(image, sample_pixels)
+        payload, legacy_scan = find_hidden_data_in_bits(read_red_lsb(image), legacy and score >= threshold)
+    return {"text": hidden_text(payload, legacy_scan), "score": round(score, 4)}
+
+
+# Function to clean hidden data from the image
+def clean_hidden_data(image_path, output_path, compress_level=None):
+    strips = open_strips(image_path)
+    if strips is not None and can_write_strips(output_path, compress_level):
+        with strips:
+            rewrite_strips(strips, output_path, strips.mode, clear_rows=strips.size[1], compress_level=compress_level)
+        return
+
+    image = load_rgb_keep_alpha(image_path)
+
+    # Cleaning the LSB from the red channel
+    clear_red_lsb(image)
+    save_image(image, output_path, compress_level)
+
+
+# Function to check one image and clean it when hidden data is found (returns the hidden data).
+# The image is decoded once: detection and cleaning share the same red band and the output is encoded once.
+def revive_image(image_path, output_path, legacy=True, payload_rows_only=False, compress_level=None):
+    strips = open_strips(image_path)
+    if strips is not None and can_write_strips(output_path, compress_level):
+        with strips:
+            return revive_strips(strips, output_path, legacy, payload_rows_only, compress_level)
+
+    image = load_rgb_keep_alpha(image_path)
+    bits = read_red_lsb(image)
+
+    hidden_data, payload_bits = None, 0
+    payload = parse_payload(bits)
+    if payload is not None:
+        hidden_data, payload_bits = payload.decode('utf-8', 'replace'), HEADER_BITS + len(payload) * 8
+    elif legacy:
+        message_end = find_eof_marker(bits)
+        if message_end != -1:
+            hidden_data, payload_bits = legacy_message(bits[:message_end]), message_end + len(EOF_MARKER)
+
+    if hidden_data:
+        rows = -(-payload_bits // image.size[0]) if payload_rows_only else None
+        clear_red_lsb(image, rows)
+        save_image(image, output_path, compress_level)
+    return hidden_data
+
+
+# Function to check and clean a large PNG strip by strip: one pass to detect, a second one to clean and re-encode
+def revive_strips(strips, output_path, legacy=True, payload_rows_only=False, compress_level=None):
+    hidden_data, payload_bits = None, 0
+    payload = read_payload_strips(strips)
+    if payload is not None:
+        hidden_data, payload_bits = payload.decode('utf-8', 'replace'), HEADER_BITS + len(payload) * 8
+    elif legacy:
+        data, tail, found = scan_eof_marker_strips(strips)
+        if found:
+            hidden_data, payload_bits = legacy_text(data, tail), len(data) * 8 + len(tail) + len(EOF_MARKER)
+
+    if hidden_data:
+        width, height = strips.size
+        rows = -(-payload_bits // width) if payload_rows_only else height
+        rewrite_strips(strips, output_path, strips.mode, clear_rows=rows, compress_level=compress_level)
+    return hidden_data
+
+
+# Function to list the images of a folder, in directory order
+def list_images(folder):
+    return [f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+# Function to draw the random text hidden by StegMake
+def random_text(length=HIDDEN_TEXT_LENGTH):
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+# Function to hash the image of a batch job (run in the worker, so the cache doesn't read files in the parent)
+def image_digest(args):
+    return file_digest(args[0])
+
+
+# Function to build the run_batch lookup/store/digest hooks that answer unchanged images from a ResultCache
+def cache_hooks(cache, kind, still_valid=None):
+    if cache is None:
+        return None, None, None
+
+    def lookup(args):
+        try:
+            hit, result = cache.lookup(args[0], kind)
+        except OSError:
+            return False, None  # Unreadable files are left to the job, which reports the error
+        if hit and still_valid and not still_valid(args, result):
+            return False, None
+        return hit, result
+
+    def store(args, result, digest):
+        cache.store(args[0], kind, result, digest)
+
+    return lookup, store, image_digest
+
+
+# Function to hide random text in every image of a folder, yielding one result row per image
+def make_images(images_path, output_path, start_number=1, workers=None, images=None):
+    if images is None:
+        images = list_images(images_path)
+
+    # Hidden texts are drawn here, in directory order, and the images are written by the worker pool
+    def jobs():
+        for i, image_name in enumerate(images, start_number):
+            output_image_path = os.path.join(output_path, f"hidden_{i}_{image_name}")
+            hidden_text = random_text()
+            yield (image_name, output_image_path, hidden_text), (os.path.join(images_path, image_name), hidden_text,
+                                                                 output_image_path)
+
+    for (image_name, output_image_path, hidden_text), _, error in run_batch(hide_text_in_image, jobs(), workers):
+        if error:
+            yield {"image": image_name, "output": None, "hidden_text": None, "error": error}
+        else:
+            yield {"image": image_name, "output": output_image_path, "hidden_text": hidden_text, "error": None}
+
+
+# Function to look for hidden text in every image of a folder, yielding one result row per image
+def analyze_images(images_path, legacy=True, workers=None, images=None, cache=None, screen=False,
+                   sample_pixels=SAMPLE_PIXELS, threshold=SUSPICIOUS_SCORE):
+    if images is None:
+        images = list_images(images_path)
+
+    if screen:
+        # Scores are RS embedding-rate estimates; results cached with the older normalized-gap score don't match
+        func, kind = screen_and_extract, f"analyze:legacy={int(legacy)},screen=rate:{sample_pixels}:{threshold}"
+        jobs = ((image_name, (os.path.join(images_path, image_name), legacy, sample_pixels, threshold))
+                for image_name in images)
+    else:
+        func, kind = extract_text_from_image, f"analyze:legacy={int(legacy)}"
+        jobs = ((image_name, (os.path.join(images_path, image_name), legacy)) for image_name in images)
+
+    lookup, store, digest = cache_hooks(cache, kind)
+    for image_name, result, error in run_batch(func, jobs, workers, lookup=lookup, store=store, digest=digest):
+        if error:
+            yield {"image": image_name, "verdict": "error", "status": None, "text": None, "score": None,
+                   "error": error}
+            continue
+
+        extracted_text, score = (result["text"], result["score"]) if screen else (result, None)
+        if not is_clear(extracted_text):
+            verdict, status = "hidden", extracted_text
+        elif score is not None and score >= threshold:
+            verdict, status = "suspicious", f"Suspicious (score {score:.2f})"
+        else:
+            verdict, status = "clear", "Clear"
+        yield {"image": image_name, "verdict": verdict, "status": status, "text": extracted_text, "score": score,
+               "error": None}
+
+
+# Function to clean every image of a folder that carries hidden data, yielding one result row per image
+def revive_images(input_folder, output_folder, legacy=True, workers=None, images=None, cache=None,
+                  payload_rows_only=False, compress_level=REVIVE_COMPRESS_LEVEL):
+    if images is None:
+        images = list_images(input_folder)
+
+    # A cached dirty image only counts as done while its cleaned copy is still in the output folder
+    lookup, store, digest = cache_hooks(cache, f"revive:legacy={int(legacy)},rows={int(payload_rows_only)}",
+                                still_valid=lambda args, hidden_data: not hidden_data or os.path.exists(args[1]))
+    jobs = ((image_name, (os.path.join(input_folder, image_name),
+                          os.path.join(output_folder, f"revived_{image_name}"), legacy, payload_rows_only,
+                          compress_level))
+            for image_name in images)
+    for image_name, hidden_data, error in run_batch(revive_image, jobs, workers, lookup=lookup, store=store,
+                                                    digest=digest):
+        if error:
+            yield {"image": image_name, "hidden_data": None, "output": None, "error": error}
+        elif hidden_data:
+            yield {"image": image_name, "hidden_data": hidden_data,
+                   "output": os.path.join(output_folder, f"revived_{image_name}"), "error": None}
+        else:
+            yield {"image": image_name, "hidden_data": None, "output": None, "error": None}
+
+
+# Report writer that streams result rows to CSV, JSON Lines or write-only Excel
+class ReportWriter:
+    def __init__(self, path, columns, report_format=None):
+        self.path = path
+        self.columns = columns
+        self.format = report_format or self.guess_format(path)
+        self.file = None
+        self.workbook = None
+
+        if self.format == 'xlsx':
+            # Write-only workbooks flush rows as they go instead of keeping every cell in memory
+            self.workbook = openpyxl.Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet()
+            self.sheet.append([header for header, _ in columns])
+        elif self.format == 'csv':
+            self.file = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow([header for header, _ in columns])
+        elif self.format == 'jsonl':
+            self.file = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8')
+        else:
+            raise ValueError(f"Unsupported report format: {self.format}")
+
+    @staticmethod
+    def guess_format(path):
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        if extension in ('csv', 'xlsx'):
+            return extension
+        return 'jsonl'
+
+    def values(self, row):
+        # Failed rows show the error in the columns they couldn't fill
+        error = row.get("error")
+        return [row.get(key) if row.get(key) is not None or not error else f"Error: {error}"
+                for _, key in self.columns]
+
+    @timed("report")
+    def write(self, row):
+        if self.format == 'jsonl':
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        elif self.format == 'csv':
+            self.writer.writerow(self.values(row))
+        else:
+            # Control characters (common in legacy hidden data) can't be stored in a worksheet, so they're dropped
+            cells = [WriteOnlyCell(self.sheet, value=ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str)
+                                   else value)
+                     for value in self.values(row)]
+            fill = VERDICT_FILLS.get(row.get("verdict"))
+            if fill:
+                keys = [key for _, key in self.columns]
+                cells[keys.index("status") if "status" in keys else -1].fill = fill
+            self.sheet.append(cells)
+
+    @timed("report")
+    def close(self):
+        if self.workbook is not None:
+            self.workbook.save(self.path)
+        elif self.file is not sys.stdout:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import StegTiming
+from StegTiming import stage
+
+# Images kept in flight per worker (bounds memory on very large folders)
+IN_FLIGHT_PER_WORKER = 4
+
+
+# Function to pick the default number of worker processes
+def default_workers():
+    return os.cpu_count() or 1
+
+
+# Function to pick how worker processes are started. Forking copies only the calling thread, so a pool created off
+# the main thread (the GUIs run their batches in the background) could inherit locks held by the others: those
+# pools start fresh interpreters instead. None keeps the platform default.
+def pool_context():
+    if threading.current_thread() is threading.main_thread():
+        return None
+    return multiprocessing.get_context('spawn')
+
+
+# Function to run one job and turn any exception into an error message, returning (result, error, stages, digest).
+# With timed=True the job's stages are timed in this (worker) process and returned as the third item.
+# digest(args), when given, is computed here too (before the job) and returned as the fourth item.
+def run_job(func, args, timed=False, digest=None):
+    if timed:
+        StegTiming.start()
+    try:
+        if digest:
+            with stage("cache hash"):
+                digest = digest(args)
+        # Job time not claimed by a named stage
+        with stage("other"):
+            result, error = func(*args), None
+    except Exception as e:
+        result, error, digest = None, f"{type(e).__name__}: {e}", None
+    return result, error, StegTiming.stop().stages() if timed else None, digest
+
+
+# Function to run one job in a process of its own, so that a job which kills its worker only fails itself
+def run_alone(func, args, timed=False, digest=None):
+    with ProcessPoolExecutor(max_workers=1, mp_context=pool_context()) as pool:
+        try:
+            return pool.submit(run_job, func, args, timed, digest).result()
+        except BrokenProcessPool as e:
+            return None, f"{type(e).__name__}: {e}", None, None
+
+
+# Function to run jobs on a process pool, yielding (key, result, error) in the order the jobs were given.
+# lookup(args) may answer a job without running it by returning (True, result); store(args, result, digest) is
+# called for every job that did run successfully. Both are called in this process. digest(args) is computed in
+# the worker, next to the job, and handed to store (None without a digest function).
+# While StegTiming is on, the workers time their stages too and send them back with the results.
+# A worker that dies (killed, out of memory, crashed in native code) fails only the job it was running: the jobs
+# caught in the broken pool are run again one at a time, and the remaining jobs go to a fresh pool.
+def run_batch(func, jobs, workers=None, max_in_flight=None, lookup=None, store=None, digest=None):
+    workers = max(1, workers or default_workers())
+    max_in_flight = max(1, max_in_flight or workers * IN_FLIGHT_PER_WORKER)
+    timer = StegTiming.active
+
+    def finish(key, args, future, cached):
+        with stage("pool wait"):
+            result, error, stages, job_digest = future.result()
+        if timer is not None:
+            timer.images += 1
+            if stages:
+                timer.merge(stages)
+        if store and not cached and not error:
+            with stage("cache store"):
+                store(args, result, job_digest)
+        return key, result, error
+
+    def start(key, args, submit):
+        if lookup:
+            with stage("cache lookup"):
+                hit, result = lookup(args)
+            if hit:
+                future = Future()
+                future.set_result((result, None, None, None))
+                return key, args, future, True
+        return key, args, submit(args), False
+
+    # A single worker runs in-process, without the cost of starting a pool
+    if workers == 1:
+        def run_now(args):
+            future = Future()
+            future.set_result(run_job(func, args, digest=digest))
+            return future
+
+        for key, args in jobs:
+            yield finish(*start(key, args, run_now))
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+    pending = deque()
+
+    def submit(args):
+        return pool.submit(run_job, func, args, timer is not None, digest)
+
+    def next_result():
+        nonlocal pool
+        with stage("pool wait"):
+            broken = isinstance(pending[0][2].exception(), BrokenProcessPool)
+        if not broken:
+            return finish(*pending.popleft())
+
+        # Every job still in the pool failed with it; the ones that hadn't finished are rerun alone, in order
+        pool.shutdown(wait=True)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+        for index, (key, args, future, cached) in enumerate(pending):
+            if isinstance(future.exception(), BrokenProcessPool):
+                future = Future()
+                future.set_result(run_alone(func, args, timer is not None, digest))
+                pending[index] = key, args, future, cached
+        return finish(*pending.popleft())
+
+    try:
+        for key, args in jobs:
+            pending.append(start(key, args, submit))
+            if len(pending) >= max_in_flight:
+                yield next_result()
+
+        while pending:
+            yield next_result()
+    except GeneratorExit:
+        # Closed early (cancelled): queued jobs are dropped, only the ones already running are waited for
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        pool.shutdown(wait=True)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Pending writes committed together (an interrupted run loses at most this many results)
+COMMIT_EVERY = 256
+
+# Bytes read per step while hashing an image file
+HASH_CHUNK = 1 << 20
+
+
+# Function to hash the content of a file
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# On-disk index of per-image results, keyed by path, size, mtime and content hash
+class ResultCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS results (
+                               path TEXT NOT NULL,
+                               kind TEXT NOT NULL,
+                               size INTEGER NOT NULL,
+                               mtime_ns INTEGER NOT NULL,
+                               digest TEXT NOT NULL,
+                               result TEXT NOT NULL,
+                               seen_at REAL NOT NULL,
+                               PRIMARY KEY (path, kind))""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_digest ON results (digest, kind)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_size ON results (size, kind)")
+        self.db.commit()
+        self.pending = 0
+
+    # Returns (True, result) when the file's result is known, (False, None) otherwise
+    def lookup(self, path, kind):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.db.execute("SELECT size, mtime_ns, result FROM results WHERE path = ? AND kind = ?",
+                              (path, kind)).fetchone()
+
+        # Unchanged size and mtime: answered without reading the file
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.write("UPDATE results SET seen_at = ? WHERE path = ? AND kind = ?", (time.time(), path, kind))
+            return True, json.loads(row[2])
+
+        # Touched, copied or moved files are matched by content. A file can only match a result of the same size,
+        # so it's only read and hashed when there is one
+        if not self.db.execute("SELECT 1 FROM results WHERE size = ? AND kind = ? LIMIT 1",
+                               (stat.st_size, kind)).fetchone():
+            return False, None
+        digest = file_digest(path)
+        row = self.db.execute("SELECT result FROM results WHERE digest = ? AND kind = ? LIMIT 1",
+                              (digest, kind)).fetchone()
+        if row:
+            self.save(path, kind, stat, digest, row[0])
+            return True, json.loads(row[0])
+        return False, None
+
+    # digest is the file's file_digest when the caller already has it (batch workers hash the files they process)
+    def store(self, path, kind, result, digest=None):
+        path = os.path.abspath(path)
+        self.save(path, kind, os.stat(path), digest or file_digest(path), json.dumps(result))
+
+    def save(self, path, kind, stat, digest, result):
+        self.write("INSERT OR REPLACE INTO results (path, kind, size, mtime_ns, digest, result, seen_at) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   (path, kind, stat.st_size, stat.st_mtime_ns, digest, result, time.time()))
+
+    def write(self, sql, params):
+        self.db.execute(sql, params)
+        self.pending += 1
+        if self.pending >= COMMIT_EVERY:
+            self.db.commit()
+            self.pending = 0
+
+    # Drops entries for files that no longer exist or weren't seen for max_age seconds, then shrinks the file
+    def compact(self, max_age=None):
+        self.db.commit()
+        if max_age is not None:
+            self.db.execute("DELETE FROM results WHERE seen_at < ?", (time.time() - max_age,))
+        missing = [(path,) for (path,) in self.db.execute("SELECT DISTINCT path FROM results")
+                   if not os.path.exists(path)]
+        self.db.executemany("DELETE FROM results WHERE path = ?", missing)
+        self.db.commit()
+        self.db.execute("VACUUM")
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,203 @@
+import struct
+import zlib
+import numpy as np
+from PIL import Image
+from StegTiming import timed
+
+# Payload header: magic, format version, payload length in bytes, CRC32 of the payload
+HEADER_MAGIC = b'STEG'
+HEADER_VERSION = 1
+HEADER_FORMAT = '>4sBII'
+HEADER_BITS = struct.calcsize(HEADER_FORMAT) * 8
+
+# End-of-file marker that terminated messages before the header format (still read as a fallback)
+EOF_MARKER = '1111111111111110'
+EOF_BITS = np.array([int(bit) for bit in EOF_MARKER], dtype=np.uint8)
+
+# Number of LSBs scanned per step while looking for the EOF marker
+SCAN_CHUNK = 1 << 20
+
+
+# Function to open an image the way all LSB tools expect it (RGB, 8 bits per channel)
+@timed("decode")
+def load_rgb(image_path):
+    return Image.open(image_path).convert('RGB')
+
+
+# Function to read an image's size without decoding it
+def image_size(image_path):
+    with Image.open(image_path) as image:
+        return image.size
+
+
+# Function to open an image for cleaning: RGB, or RGBA when the image has transparency worth keeping
+@timed("decode")
+def load_rgb_keep_alpha(image_path):
+    image = Image.open(image_path)
+    if image.mode in ('RGB', 'RGBA'):
+        image.load()
+        return image
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+# Function to tell whether an opened image can decode its top rows without the rest (PNG rows are stored in order)
+def decodes_by_rows(image):
+    return image.format == 'PNG' and len(image.tile) == 1 and not image.info.get('interlace')
+
+
+# Function to tell whether an image file can decode its top rows without the rest
+def file_decodes_by_rows(image_path):
+    with Image.open(image_path) as image:
+        return decodes_by_rows(image)
+
+
+# Function to decode only the top rows of an image (falls back to the full frame when the format can't do it)
+@timed("decode")
+def load_rgb_rows(image_path, rows):
+    image = Image.open(image_path)
+    width, height = image.size
+    if rows < height and decodes_by_rows(image):
+        # PNG rows are stored top to bottom, so the decoder can stop once the first rows are filled
+        tile = image.tile[0]
+        x0, y0, x1, y1 = tile[1]
+        image._size = (width, rows)
+        image.tile = [(tile[0], (x0, y0, x1, y0 + rows)) + tuple(tile[2:])]
+    return image.convert('RGB')
+
+
+# Function to turn text into its LSB bit sequence (header followed by the UTF-8 payload)
+@timed("bit packing")
+def payload_to_bits(text):
+    data = text.encode('utf-8')
+    header = struct.pack(HEADER_FORMAT, HEADER_MAGIC, HEADER_VERSION, len(data), zlib.crc32(data))
+    return np.unpackbits(np.frombuffer(header + data, dtype=np.uint8))
+
+
+# Function to read the least significant bit of the red channel for every pixel
+@timed("bit plane")
+def read_red_lsb(image):
+    red = np.asarray(image.getchannel('R')).reshape(-1)
+    return red & 1
+
+
+# Function to read the red channel LSBs of the first pixels only
+def read_red_lsb_prefix(image_path, count):
+    width, height = image_size(image_path)
+    rows = min(height, -(-count // width))
+    return read_red_lsb(load_rgb_rows(image_path, rows))[:count]
+
+
+# Function to read the payload length and checksum from a header (None when the bits don't start with one)
+def parse_header(bits):
+    if len(bits) < HEADER_BITS:
+        return None
+    return unpack_header(bits_to_bytes(bits[:HEADER_BITS]))
+
+
+# Function to read the payload length and checksum from the header bytes (None when they aren't a header)
+def unpack_header(data):
+    if len(data) < HEADER_BITS // 8:
+        return None
+    magic, version, length, checksum = struct.unpack(HEADER_FORMAT, data[:HEADER_BITS // 8])
+    if magic != HEADER_MAGIC or version != HEADER_VERSION:
+        return None
+    return length, checksum
+
+
+# Function to read a header-format payload from an already decoded bit plane
+def parse_payload(bits):
+    header = parse_header(bits)
+    if header is None or HEADER_BITS + header[0] * 8 > len(bits):
+        return None
+    data = bits_to_bytes(bits[HEADER_BITS:HEADER_BITS + header[0] * 8])
+    if zlib.crc32(data) != header[1]:
+        return None
+    return data
+
+
+# Function to read a header-format payload (None when the image doesn't carry a valid header)
+def read_payload(image_path):
+    with Image.open(image_path) as image:
+        width, height = image.size
+        by_rows = decodes_by_rows(image)
+
+    # Formats that can't stop after the top rows are decoded once, for the header and the payload alike
+    if not by_rows:
+        return parse_payload(read_red_lsb(load_rgb(image_path)))
+
+    header = parse_header(read_red_lsb_prefix(image_path, HEADER_BITS))
+    if header is None or HEADER_BITS + header[0] * 8 > width * height:
+        return None
+
+    # Decode just enough pixels for the header and the payload
+    return parse_payload(read_red_lsb_prefix(image_path, HEADER_BITS + header[0] * 8))
+
+
+# Function to split a bit plane at the legacy EOF marker.
+# Returns the whole bytes before the marker, the bits of a trailing partial byte and whether the marker was found;
+# without a marker every LSB of the image counts as the message.
+def split_eof_marker(bits):
+    message_end = find_eof_marker(bits)
+    if message_end != -1:
+        bits = bits[:message_end]
+    return bits_to_bytes(bits), bits[len(bits) - len(bits) % 8:], message_end != -1
+
+
+# Function to locate the EOF marker in a bit plane (-1 when there is none)
+@timed("marker scan")
+def find_eof_marker(bits):
+    marker_len = len(EOF_BITS)
+    for start in range(0, len(bits), SCAN_CHUNK):
+        window = bits[start:start + SCAN_CHUNK + marker_len - 1]
+        if len(window) < marker_len:
+            break
+
+        # The marker is fifteen 1s followed by a 0: count the ones in every 15-bit run
+        ones = np.concatenate(([0], np.cumsum(window, dtype=np.int32)))
+        run = ones[marker_len - 1:len(window)] - ones[:len(window) - marker_len + 1]
+        hits = np.flatnonzero((run == marker_len - 1) & (window[marker_len - 1:] == 0))
+        if len(hits):
+            return start + int(hits[0])
+    return -1
+
+
+# Function to pack a bit sequence into bytes, dropping any trailing partial byte
+@timed("bit packing")
+def bits_to_bytes(bits):
+    return np.packbits(bits[:len(bits) - len(bits) % 8]).tobytes()
+
+
+# Function to write a bit sequence into the red channel LSBs, starting at the first pixel
+@timed("embed")
+def embed_bits(image, bits):
+    width, height = image.size
+    bits = bits[:width * height]
+    if not len(bits):
+        return
+
+    # Only the rows that carry payload are touched
+    rows = -(-len(bits) // width)
+    region = np.array(image.crop((0, 0, width, rows)))
+    red = region[..., 0].reshape(-1)
+    red[:len(bits)] = (red[:len(bits)] & 0xFE) | bits
+    region[..., 0] = red.reshape(rows, width)
+    image.paste(Image.fromarray(region, 'RGB'), (0, 0))
+
+
+# Function to clear the red channel LSB of every pixel (or of the top rows only), in place
+@timed("clean")
+def clear_red_lsb(image, rows=None):
+    width, height = image.size
+    if rows is not None and rows < height:
+        region = image.crop((0, 0, width, rows))
+        clear_red_lsb(region)
+        image.paste(region, (0, 0))
+        return
+
+    # Only the red band is copied out and written back, the other bands stay untouched
+    red = np.array(image.getchannel('R'))
+    red &= 0xFE
+    image.load()
+    image.im.putband(Image.fromarray(red).im, 0)
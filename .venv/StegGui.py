@@ -0,0 +1,122 @@
+import queue
+import sys
+import threading
+import tkinter as tk
+from tkinter import messagebox
+import StegTiming
+
+# Lines kept in a console; older lines are dropped as new ones arrive
+CONSOLE_MAX_LINES = 2000
+
+# Milliseconds between two drains of a batch's message queue, and messages handled per drain
+DRAIN_INTERVAL_MS = 100
+DRAIN_BATCH = 1000
+
+
+# Function to append (text, tag) pieces to a read-only console in one go, keeping only its last max_lines lines
+def append_console(console, pieces, max_lines=CONSOLE_MAX_LINES):
+    if not pieces:
+        return
+    console.configure(state='normal')
+    console.insert(tk.END, *[item for text, tag in pieces[-max_lines:] for item in (text, tag)])
+    excess = int(console.index('end-1c').split('.')[0]) - max_lines
+    if excess > 0:
+        console.delete('1.0', f'{excess + 1}.0')
+    console.configure(state='disabled')
+    console.see(tk.END)
+
+
+# Batch that runs on a background thread while the Tk thread stays responsive.
+# work(post, cancelled) runs on the thread: it hands messages to post() and stops early once cancelled() is true.
+# handle(messages) gets the posted messages on the Tk thread, a batch at a time; finish(error, cancelled) is
+# called there once the work is over (error is None unless the work raised).
+class BackgroundBatch:
+    def __init__(self, root, work, handle, finish):
+        self.root = root
+        self.handle = handle
+        self.finish = finish
+        self.messages = queue.Queue()
+        self.cancel_requested = threading.Event()
+        self.done = False
+        self.error = None
+
+        self.thread = threading.Thread(target=self.run, args=(work,), daemon=True)
+        self.thread.start()
+        self.root.after(DRAIN_INTERVAL_MS, self.drain)
+
+    def run(self, work):
+        try:
+            work(self.messages.put, self.cancel_requested.is_set)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.done = True
+
+    def cancel(self):
+        self.cancel_requested.set()
+
+    def drain(self):
+        # Read done before draining, so no message posted before the end is left behind
+        done = self.done
+        batch = []
+        try:
+            while len(batch) < DRAIN_BATCH:
+                batch.append(self.messages.get_nowait())
+        except queue.Empty:
+            pass
+
+        if batch:
+            self.handle(batch)
+        if done and self.messages.empty():
+            self.finish(self.error, self.cancel_requested.is_set())
+        else:
+            self.root.after(DRAIN_INTERVAL_MS, self.drain)
+
+
+# Runner behind a tool window's Start and Cancel buttons (the Cancel button is wired to it here).
+# start(work, handle, workers) runs a BackgroundBatch with Start disabled, timed when STEG_TIMING is set; once it ends
+# the buttons are reset, the timings go to stderr and the outcome is shown in a message box. name is the job as the
+# message boxes call it ("Analysis" gives "Analysis failed: ...", "Analysis cancelled after 3 images.", ...).
+class BatchRunner:
+    def __init__(self, root, start_button, cancel_button, progress, name, cancelled_title="Cancelled",
+                 complete_title="Success", complete_message=None):
+        self.root = root
+        self.start_button = start_button
+        self.cancel_button = cancel_button
+        self.progress = progress
+        self.name = name
+        self.cancelled_title = cancelled_title
+        self.complete_title = complete_title
+        self.complete_message = complete_message or f"{name} complete!"
+        self.batch = None  # Batch running in the background, if any
+        self.workers = None
+        self.cancel_button.configure(command=self.cancel)
+
+    def start(self, work, handle, workers):
+        if StegTiming.requested():
+            StegTiming.start()
+        self.workers = workers
+        self.start_button.configure(state='disabled')
+        self.cancel_button.configure(state='normal')
+        self.batch = BackgroundBatch(self.root, work, handle, self.finish)
+
+    def cancel(self):
+        if self.batch is not None:
+            self.batch.cancel()
+            self.cancel_button.configure(state='disabled')
+
+    def finish(self, error, cancelled):
+        self.batch = None
+        self.start_button.configure(state='normal')
+        self.cancel_button.configure(state='disabled')
+        timer = StegTiming.stop()
+        if timer is not None:
+            timer.write_summary(sys.stderr, self.workers)
+
+        if error:
+            messagebox.showerror("Error", f"{self.name} failed: {error}")
+        elif cancelled:
+            messagebox.showinfo(self.cancelled_title,
+                                f"{self.name} cancelled after {int(self.progress['value'])} images.")
+        else:
+            messagebox.showinfo(self.complete_title, self.complete_message)
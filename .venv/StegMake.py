@@ -0,0 +1,169 @@
+import os
+import tkinter as tk
+from functools import partial
+from tkinter import filedialog, ttk, messagebox
+from StegApi import hide_text_in_image, list_images, make_images, ReportWriter, MAKE_COLUMNS
+from StegBatch import default_workers
+from StegGui import BatchRunner, append_console
+from StegTiming import timed
+
+
+# GUI Application class
+class SteganographyApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("StegMake")  # Set the title
+        self.root.configure(bg="black")  # Dark background
+        self.root.resizable(False, False)  # Fixed window size
+
+        # Paths
+        self.images_path = tk.StringVar()
+        self.output_path = tk.StringVar()
+        self.excel_path = tk.StringVar()
+        self.start_number = tk.IntVar(value=1)  # Default starting number for renaming
+        self.workers = tk.IntVar(value=default_workers())  # Worker processes used for the batch
+
+        # GUI layout
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Title label with hacker-style font
+        tk.Label(self.root, text="StegMake", bg="black", fg="limegreen", font=("Anonymous Pro", 24, "bold")).grid(row=0,
+                                                                                                                  column=0,
+                                                                                                                  columnspan=3,
+                                                                                                                  pady=20)
+
+        tk.Label(self.root, text="Path to Images:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=1,
+                                                                                                                 column=0,
+                                                                                                                 padx=10,
+                                                                                                                 pady=5,
+                                                                                                                 sticky='w')
+        tk.Entry(self.root, textvariable=self.images_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=1, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_images, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=1, column=2, padx=10, pady=5)
+
+        tk.Label(self.root, text="Output Path:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=2,
+                                                                                                              column=0,
+                                                                                                              padx=10,
+                                                                                                              pady=5,
+                                                                                                              sticky='w')
+        tk.Entry(self.root, textvariable=self.output_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=2, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_output, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=2, column=2, padx=10, pady=5)
+
+        tk.Label(self.root, text="Excel File Path:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=3,
+                                                                                                                  column=0,
+                                                                                                                  padx=10,
+                                                                                                                  pady=5,
+                                                                                                                  sticky='w')
+        tk.Entry(self.root, textvariable=self.excel_path, width=50, bg="black", fg="limegreen",
+                 insertbackground="limegreen", font=("Anonymous Pro", 12)).grid(row=3, column=1, padx=10, pady=5)
+        tk.Button(self.root, text="Browse", command=self.browse_excel, bg="black", fg="limegreen", relief="raised",
+                  bd=3, font=("Anonymous Pro", 12)).grid(row=3, column=2, padx=10, pady=5)
+
+        tk.Label(self.root, text="Starting Number for Renaming:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=4,
+                                                                                                                  column=0,
+                                                                                                                  padx=10,
+                                                                                                                  pady=5,
+                                                                                                                  sticky='w')
+        tk.Entry(self.root, textvariable=self.start_number, width=10, bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=4, column=1, padx=10, pady=5)
+
+        tk.Label(self.root, text="Worker Processes:", bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=5,
+                                                                                                                   column=0,
+                                                                                                                   padx=10,
+                                                                                                                   pady=5,
+                                                                                                                   sticky='w')
+        tk.Entry(self.root, textvariable=self.workers, width=10, bg="black", fg="limegreen", font=("Anonymous Pro", 12)).grid(row=5, column=1, padx=10, pady=5)
+
+        self.console = tk.Text(self.root, height=10, state='disabled', bg='black', fg='limegreen',
+                               font=("Courier", 12))  # Changed font to Courier
+        self.console.grid(row=6, column=0, columnspan=3, padx=10, pady=10, sticky='ew')
+
+        self.progress = ttk.Progressbar(self.root, orient='horizontal', mode='determinate', length=400)
+        self.progress.grid(row=7, column=0, columnspan=3, padx=10, pady=10)
+
+        self.start_button = tk.Button(self.root, text="Start", command=self.start_processing, bg="black",
+                                      fg="limegreen", relief="raised", bd=3, font=("Anonymous Pro", 12))
+        self.start_button.grid(row=8, column=1, pady=10)
+        self.cancel_button = tk.Button(self.root, text="Cancel", bg="black", fg="limegreen", relief="raised", bd=3,
+                                       font=("Anonymous Pro", 12), state='disabled')
+        self.cancel_button.grid(row=8, column=2, pady=10)
+        self.runner = BatchRunner(self.root, self.start_button, self.cancel_button, self.progress, "Processing")
+
+    def browse_images(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.images_path.set(path)
+
+    def browse_output(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.output_path.set(path)
+
+    def browse_excel(self):
+        path = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"),
+                                                       ("JSON Lines files", "*.jsonl")])
+        if path:
+            self.excel_path.set(path)
+
+    @timed("console")
+    def log_to_console(self, messages):
+        append_console(self.console, [(message + "\n\n", ()) for message in messages])  # Empty line after every message
+
+    def start_processing(self):
+        images_path = self.images_path.get()
+        output_path = self.output_path.get()
+        excel_path = self.excel_path.get()
+        starting_number = self.start_number.get()
+        workers = self.workers.get()
+
+        if not os.path.isdir(images_path):
+            messagebox.showerror("Error", "Invalid images folder path.")
+            return
+
+        if not os.path.isdir(output_path):
+            messagebox.showerror("Error", "Invalid output folder path.")
+            return
+
+        if not excel_path:
+            messagebox.showerror("Error", "Invalid Excel file path.")
+            return
+
+        images = list_images(images_path)
+        self.progress['maximum'] = len(images)
+        self.progress['value'] = 0
+
+        # The batch runs in the background; the window keeps responding and can cancel it
+        work = partial(self.process, images_path=images_path, output_path=output_path, excel_path=excel_path,
+                       starting_number=starting_number, workers=workers, images=images)
+        self.runner.start(work, self.show_rows, workers)
+
+    # Runs on the batch thread: report rows are streamed to the Excel (or CSV / JSON Lines) file as images complete
+    def process(self, post, cancelled, images_path, output_path, excel_path, starting_number, workers, images):
+        with ReportWriter(excel_path, MAKE_COLUMNS) as report:
+            rows = make_images(images_path, output_path, starting_number, workers, images)
+            for row in rows:
+                report.write(row)
+                post(row)
+                if cancelled():
+                    rows.close()  # Images not started yet are dropped
+                    break
+
+    def show_rows(self, rows):
+        messages = []
+        for row in rows:
+            if row["error"]:
+                messages.append(f"Failed: {row['image']}, Error: {row['error']}")
+            else:
+                messages.append(f"Processed: {os.path.basename(row['output'])}, Hidden Text: {row['hidden_text']}")
+        self.log_to_console(messages)
+        self.progress['value'] += len(rows)
+
+# Main
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = SteganographyApp(root)
+    root.mainloop()
@@ -0,0 +1,125 @@
+import math
+import numpy as np
+from StegCore import load_rgb_rows, image_size
+from StegTiming import timed
+
+# Pixels decoded for the pre-screen (the top of the image, where sequential LSB embedding starts)
+SAMPLE_PIXELS = 1 << 18
+
+# Pixels per block; every block and channel gets its own RS test
+BLOCK_PIXELS = 1 << 14
+
+# Estimated embedding rates at or above this are sent down the full extraction path. Calibrated on 220 clean synthetic
+# covers (gradients with noise sigma 0.5-32, 1/f textures, JPEG-decoded images, near-white skies and dark shadows with
+# clipping): none scored above 0. With the red channel fully embedded, covers whose blocks pass the checks below score
+# 0.3-1.0, but RS analysis can't see LSB embedding in noisy covers (sigma 16 and up score 0 either way), only 8 of 20
+# high-contrast 1/f textures were caught, and clipped samples aren't judged at all
+SUSPICIOUS_SCORE = 0.2
+
+# RS analysis works on groups of 4 neighbouring pixels and flips the middle two
+GROUP_SIZE = 4
+FLIP_MASK = np.array([False, True, True, False])
+
+# Blocks with fewer unclipped groups than this are too small to judge
+MIN_USABLE_GROUPS = 256
+
+# Blocks where more groups than this share hold a clipped value (0 or 255) aren't judged: clipped highlights and
+# shadows break the symmetry RS analysis relies on, and leaving those groups out biases the rest
+MAX_CLIPPED_GROUPS = 0.15
+
+# The estimate only counts when the flips differ by this many standard errors (in noisy blocks it is mostly noise)
+MIN_SIGNIFICANCE = 4.0
+
+
+# Function to measure the smoothness of every pixel group (sum of absolute neighbour differences)
+def group_smoothness(groups):
+    return np.abs(np.diff(groups, axis=1)).sum(axis=1)
+
+
+# Function to tell, for every group, whether flipping the masked pixels makes it regular (1: rougher),
+# singular (-1: smoother) or neither (0).
+# shifted=False flips 0<->1, 2<->3, ... (what LSB embedding does); shifted=True flips -1<->0, 1<->2, ...
+def flip_signs(groups, smoothness, shifted):
+    flipped = groups.copy()
+    masked = flipped[:, FLIP_MASK]
+    flipped[:, FLIP_MASK] = ((masked + 1) ^ 1) - 1 if shifted else masked ^ 1
+    return np.sign(group_smoothness(flipped) - smoothness)
+
+
+# Function to get the R - S differences of a set of groups under both flips (R_M - S_M, R_-M - S_-M, per group)
+def rs_differences(groups):
+    smoothness = group_smoothness(groups)
+    return flip_signs(groups, smoothness, shifted=False), flip_signs(groups, smoothness, shifted=True)
+
+
+# Function to solve the RS equation for the embedding rate (share of pixels carrying message bits) from the
+# R - S differences of the block (d0, d_neg0) and of the block with every LSB flipped (d1, d_neg1)
+def embedding_rate(d0, d_neg0, d1, d_neg1):
+    a = 2 * (d1 + d0)
+    b = d_neg0 - d_neg1 - d1 - 3 * d0
+    c = d0 - d_neg0
+    if abs(a) < 1e-9:
+        z = -c / b if abs(b) > 1e-9 else 0.0
+    else:
+        root = math.sqrt(max(b * b - 4 * a * c, 0.0))
+        z = min((-b + root) / (2 * a), (-b - root) / (2 * a), key=abs)
+    if abs(z - 0.5) < 1e-9:
+        return 1.0
+    return min(1.0, max(0.0, z / (z - 0.5)))
+
+
+# Function to score one channel block with RS analysis: its estimated embedding rate, 0 when it can't be judged.
+# In a clean image both flips change the groups the same way (R_M - S_M ~ R_-M - S_-M); overwriting LSBs pulls
+# R_M and S_M together and pushes R_-M and S_-M apart.
+@timed("rs screen")
+def rs_score(values):
+    count = len(values) // GROUP_SIZE * GROUP_SIZE
+    if not count:
+        return 0.0
+    groups = values[:count].astype(np.int16).reshape(-1, GROUP_SIZE)
+    clipped = ((groups == 0) | (groups == 255)).any(axis=1)
+    if clipped.mean() > MAX_CLIPPED_GROUPS:
+        return 0.0
+    groups = groups[~clipped]
+    if len(groups) < MIN_USABLE_GROUPS:
+        return 0.0
+
+    flip, shifted = rs_differences(groups)
+    gap = shifted - flip
+    if gap.mean() * math.sqrt(len(gap)) <= MIN_SIGNIFICANCE * gap.std():
+        return 0.0
+
+    flip_all, shifted_all = rs_differences(groups ^ 1)
+    return embedding_rate(flip.mean(), shifted.mean(), flip_all.mean(), shifted_all.mean())
+
+
+# Function to work out how many top rows hold the sample (at least one, at most the whole image)
+def sample_rows(width, height, sample_pixels):
+    return max(1, min(height, -(-sample_pixels // width)))
+
+
+# Function to score how likely an image is to carry LSB data, from a sample of its top pixels.
+# Returns the overall score (the highest block score) and the per-channel block scores.
+def screen_image(image_path, sample_pixels=SAMPLE_PIXELS, block_pixels=BLOCK_PIXELS):
+    width, height = image_size(image_path)
+    return screen_rgb(load_rgb_rows(image_path, sample_rows(width, height, sample_pixels)), sample_pixels,
+                      block_pixels)
+
+
+# Function to score an already decoded RGB image the same way, from the same top pixels
+def screen_rgb(image, sample_pixels=SAMPLE_PIXELS, block_pixels=BLOCK_PIXELS):
+    width, height = image.size
+    rows = sample_rows(width, height, sample_pixels)
+    if rows < height:
+        image = image.crop((0, 0, width, rows))
+    pixels = np.asarray(image).reshape(-1, 3)[:sample_pixels]
+
+    channels = {}
+    for index, band in enumerate('RGB'):
+        values = pixels[:, index]
+        # A trailing partial block is left out unless it's the whole sample
+        channels[band] = [rs_score(values[start:start + block_pixels])
+                          for start in range(0, max(len(values) - block_pixels, 0) + 1, block_pixels)]
+
+    score = max(max(scores) for scores in channels.values())
+    return score, channels
@@ -0,0 +1,319 @@
+import functools
+import io
+import os
+import struct
+import zlib
+import numpy as np
+from PIL import Image, ImageFile
+from StegCore import EOF_BITS, HEADER_BITS, find_eof_marker, bits_to_bytes, unpack_header
+from StegTiming import timed
+
+# Pixels decoded, processed and encoded per strip (peak memory follows this, not the image size)
+STRIP_PIXELS = 1 << 20
+
+# Images at least this large go strip by strip; smaller ones keep the faster whole-image path
+STRIP_MIN_PIXELS = 1 << 24
+
+# Bytes of compressed image data read from the file per step
+READ_CHUNK = 1 << 20
+
+# PNG layout
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+PNG_COLOR_TYPES = {'RGB': 2, 'RGBA': 6}
+
+# Filter cost of a filtered byte, as Pillow's encoder scores it (distance from zero as a signed byte)
+FILTER_COST = np.array([v if v < 128 else 256 - v for v in range(256)], dtype=np.uint16)
+
+
+# Strip-by-strip reader for non-interlaced 8-bit RGB/RGBA PNGs. The compressed data is inflated a strip at a
+# time and every strip is unfiltered by Pillow's own decoder, so the pixels are exactly what Image.open gives.
+class PngStrips:
+    def __init__(self, image_path, mode, size, info):
+        self.mode = mode
+        self.size = size
+        self.info = info
+        self.file = open(image_path, 'rb')
+
+    # Yields the compressed image data, chunk by chunk, without loading the whole file
+    def read_idat(self):
+        self.file.seek(len(PNG_MAGIC))
+        in_idat = False
+        while True:
+            header = self.file.read(8)
+            if len(header) < 8:
+                return
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type != b'IDAT':
+                if in_idat:
+                    return
+                self.file.seek(length + 4, os.SEEK_CUR)
+                continue
+            in_idat = True
+            while length:
+                data = self.file.read(min(length, READ_CHUNK))
+                if not data:
+                    return
+                length -= len(data)
+                yield data
+            self.file.seek(4, os.SEEK_CUR)  # CRC
+
+    def strips(self, rows=None):
+        width, height = self.size
+        rows = rows or strip_rows(width)
+        stride = width * len(self.mode) + 1
+        idat = self.read_idat()  # Every pass starts over at the first row
+        inflater = zlib.decompressobj()
+        compressed = b''
+        previous = None
+
+        for top in range(0, height, rows):
+            count = min(rows, height - top)
+
+            # Inflate exactly this strip's filtered rows
+            parts, missing = [], count * stride
+            while missing:
+                if not compressed:
+                    compressed = next(idat, b'')
+                    if not compressed:
+                        raise OSError("image file is truncated")
+                part = inflater.decompress(compressed, missing)
+                compressed = inflater.unconsumed_tail
+                parts.append(part)
+                missing -= len(part)
+
+            # Rows are filtered against the row above, so the previous strip's last row goes first (unfiltered)
+            data = b''.join(parts) if previous is None else b'\0' + previous + b''.join(parts)
+            strip = np.array(self.decode(data, count + (previous is not None)))
+            if previous is not None:
+                strip = strip[1:]
+            previous = strip[-1].tobytes()
+            yield strip
+
+    @timed("decode")
+    def decode(self, data, rows):
+        return Image.frombytes(self.mode, (self.size[0], rows), zlib.compress(data, 0), 'zip', self.mode)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Strip-by-strip PNG writer whose output is byte-identical to Image.save for the same pixels and info:
+# same chunks, same per-row filter choice, same deflate settings and the same IDAT chunk sizes
+class PngStripWriter:
+    def __init__(self, output, mode, size, info=None, compress_level=None):
+        info = info or {}
+        self.mode = mode
+        self.size = size
+        self.owns_file = isinstance(output, str)
+        self.file = open(output, 'wb') if self.owns_file else output
+        self.deflater = zlib.compressobj(-1 if compress_level is None else compress_level, zlib.DEFLATED, 15, 9,
+                                         zlib.Z_FILTERED)
+        self.chunk_size = max(ImageFile.MAXBLOCK, size[0] * 4)
+        self.pending = bytearray()
+        self.previous = np.zeros(size[0] * len(mode), dtype=np.uint8)
+
+        self.file.write(PNG_MAGIC)
+        self.chunk(b'IHDR', struct.pack('>IIBBBBB', size[0], size[1], 8, PNG_COLOR_TYPES[mode], 0, 0, 0))
+        if info.get('icc_profile'):
+            self.chunk(b'iCCP', b'ICC Profile\0\0' + zlib.compress(info['icc_profile']))
+        if mode == 'RGB' and info.get('transparency') is not None:
+            self.chunk(b'tRNS', struct.pack('>HHH', *info['transparency']))
+
+    def chunk(self, chunk_type, data):
+        self.file.write(struct.pack('>I', len(data)) + chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    @timed("encode")
+    def write(self, strip):
+        rows = strip.reshape(len(strip), -1)
+        filtered = filter_rows(rows, self.previous, len(self.mode))
+        self.previous = rows[-1].copy()
+        self.pending += self.deflater.compress(filtered)
+        self.flush(self.chunk_size)
+
+    # Writes the compressed data as IDAT chunks of chunk_size bytes, keeping any shorter remainder
+    def flush(self, chunk_size):
+        start = 0
+        while len(self.pending) - start >= chunk_size:
+            self.chunk(b'IDAT', bytes(self.pending[start:start + chunk_size]))
+            start += chunk_size
+        del self.pending[:start]
+
+    @timed("encode")
+    def close(self):
+        self.pending += self.deflater.flush()
+        self.flush(self.chunk_size)
+        if self.pending:
+            self.chunk(b'IDAT', bytes(self.pending))
+        self.chunk(b'IEND', b'')
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Function to filter PNG rows the way Pillow's encoder does: every row takes the first of None, Up, Sub and
+# Paeth with the lowest cost. Returns the filtered rows with their filter type bytes, ready for deflate.
+def filter_rows(rows, previous, bpp):
+    above = np.vstack((previous[None], rows[:-1]))
+    left = np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+    upper_left = np.zeros_like(rows)
+    upper_left[:, bpp:] = above[:, :-bpp]
+
+    # Paeth predictor: the neighbour closest to left + above - upper_left (ties go left, then above)
+    left16, above16, upper_left16 = left.astype(np.int16), above.astype(np.int16), upper_left.astype(np.int16)
+    pa = np.abs(above16 - upper_left16)
+    pb = np.abs(left16 - upper_left16)
+    pc = np.abs(left16 + above16 - 2 * upper_left16)
+    predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, above, upper_left))
+
+    out = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    out[:, 0] = 0
+    out[:, 1:] = rows
+    best = FILTER_COST[rows].sum(axis=1, dtype=np.int64)
+    for filter_type, filtered in ((2, rows - above), (1, rows - left), (4, rows - predictor)):
+        cost = FILTER_COST[filtered].sum(axis=1, dtype=np.int64)
+        better = cost < best
+        out[better, 0] = filter_type
+        out[better, 1:] = filtered[better]
+        best = np.where(better, cost, best)
+    return out
+
+
+# Function to pick the strip height for an image width
+def strip_rows(width):
+    return max(1, STRIP_PIXELS // width)
+
+
+# Function to open a PNG for strip-by-strip reading (None when the image is small or the format can't stream)
+def open_strips(image_path, min_pixels=STRIP_MIN_PIXELS):
+    with Image.open(image_path) as image:
+        width, height = image.size
+        if width * height < min_pixels or image.format != 'PNG' or image.mode not in PNG_COLOR_TYPES:
+            return None
+        # 16-bit and interlaced PNGs decode through other raw modes
+        if len(image.tile) != 1 or image.tile[0][3] != image.mode or image.info.get('interlace'):
+            return None
+        transparency = image.info.get('transparency')
+        if transparency is not None and (image.mode != 'RGB' or len(transparency) != 3):
+            return None
+        return PngStrips(image_path, image.mode, image.size, image.info)
+
+
+# Function to check that strips can be written to a file with the same bytes Image.save would produce
+def can_write_strips(output_path, compress_level=None):
+    # Stored (level 0) deflate blocks depend on the encoder's buffer sizes, so they're left to Pillow
+    if os.path.splitext(output_path)[1].lower() != '.png' or compress_level == 0:
+        return False
+    return writer_matches_pillow(compress_level)
+
+
+# Function to compare the strip writer with Image.save on a small test image, once per process and level
+# (both only agree when Pillow and Python use the same zlib)
+@functools.lru_cache(maxsize=None)
+def writer_matches_pillow(compress_level=None):
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, 320, dtype=np.float32)[None, :, None]
+    pixels = np.clip(gradient + rng.normal(0, 20, (240, 320, 4)), 0, 255).astype(np.uint8)
+    for mode in PNG_COLOR_TYPES:
+        image = Image.fromarray(pixels[..., :len(mode)], mode)
+        expected = io.BytesIO()
+        image.save(expected, 'PNG', **({} if compress_level is None else {"compress_level": compress_level}))
+
+        written = io.BytesIO()
+        with PngStripWriter(written, mode, image.size, compress_level=compress_level) as writer:
+            for top in range(0, 240, 7):
+                writer.write(pixels[top:top + 7, :, :len(mode)])
+        if written.getvalue() != expected.getvalue():
+            return False
+    return True
+
+
+# Function to read the red channel LSBs strip by strip
+def red_lsb_strips(strips):
+    for strip in strips.strips():
+        yield (strip[..., 0] & 1).reshape(-1)
+
+
+# Function to pack the first count LSBs into bytes without keeping them all unpacked (count is a multiple of 8)
+def read_lsb_bytes(bit_strips, count):
+    parts, carry, needed = [], np.empty(0, dtype=np.uint8), count
+    for bits in bit_strips:
+        bits = np.concatenate((carry, bits[:needed - len(carry)]))
+        usable = len(bits) - len(bits) % 8
+        parts.append(np.packbits(bits[:usable]).tobytes())
+        carry, needed = bits[usable:], needed - usable
+        if not needed:
+            break
+    return b''.join(parts)
+
+
+# Function to read a header-format payload strip by strip (None when the image doesn't carry a valid header)
+def read_payload_strips(strips):
+    width, height = strips.size
+    header = unpack_header(read_lsb_bytes(red_lsb_strips(strips), HEADER_BITS))
+    if header is None or HEADER_BITS + header[0] * 8 > width * height:
+        return None
+
+    data = read_lsb_bytes(red_lsb_strips(strips), HEADER_BITS + header[0] * 8)[HEADER_BITS // 8:]
+    if zlib.crc32(data) != header[1]:
+        return None
+    return data
+
+
+# Function to find a legacy EOF-marker message strip by strip.
+# Returns the whole bytes before the marker, the bits of a trailing partial byte and whether the marker was found;
+# without a marker every LSB of the image counts as the message.
+def scan_eof_marker_strips(strips):
+    parts, carry = [], np.empty(0, dtype=np.uint8)
+    for bits in red_lsb_strips(strips):
+        window = np.concatenate((carry, bits))
+        message_end = find_eof_marker(window)
+        if message_end != -1:
+            window = window[:message_end]
+            usable = len(window) - len(window) % 8
+            return b''.join(parts) + bits_to_bytes(window), window[usable:], True
+
+        # The last bits stay unpacked in case the marker starts in them and ends in the next strip
+        usable = (len(window) - len(EOF_BITS) + 1) // 8 * 8
+        if usable > 0:
+            parts.append(np.packbits(window[:usable]).tobytes())
+            window = window[usable:]
+        carry = window
+
+    usable = len(carry) - len(carry) % 8
+    return b''.join(parts) + bits_to_bytes(carry), carry[usable:], False
+
+
+# Function to copy a PNG strip by strip in the given mode (RGB drops alpha), writing bits into the first red LSBs
+# and clearing the red LSB of the first clear_rows rows
+def rewrite_strips(strips, output_path, mode, bits=None, clear_rows=0, compress_level=None):
+    width = strips.size[0]
+    with PngStripWriter(output_path, mode, strips.size, strips.info, compress_level) as writer:
+        top = 0
+        for strip in strips.strips():
+            strip = strip[..., :len(mode)]
+            rows = len(strip)
+            if top < clear_rows:
+                strip[:clear_rows - top, :, 0] &= 0xFE
+
+            if bits is not None and top * width < len(bits):
+                chunk = bits[top * width:(top + rows) * width]
+                red = strip[..., 0].reshape(-1)
+                red[:len(chunk)] = (red[:len(chunk)] & 0xFE) | chunk
+                strip[..., 0] = red.reshape(rows, width)
+
+            writer.write(strip)
+            top += rows
@@ -0,0 +1,110 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Environment variable that turns stage timing on for the GUIs (any non-empty value)
+TIMING_ENV = "STEG_TIMING"
+
+# Timer collecting stages in this process (None while timing is off, so the stage hooks cost next to nothing)
+active = None
+
+
+# Per-stage wall-clock totals for one run. Nested stages are exclusive: a parent stage only counts the time
+# its children didn't, so the stage totals add up to the time spent in the timed code.
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        self.images = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Stages nest per thread (the GUIs time on the Tk thread and a worker)
+        self.started = time.perf_counter()
+
+    # Time spent in child stages, one entry per open stage of the calling thread
+    def children(self):
+        if not hasattr(self.local, "children"):
+            self.local.children = [0.0]
+        return self.local.children
+
+    def add(self, name, seconds, calls=1):
+        with self.lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    # Folds in the stages timed by a worker process (as returned by stages())
+    def merge(self, stages):
+        for name, (seconds, calls) in stages.items():
+            self.add(name, seconds, calls)
+
+    def stages(self):
+        return {name: (self.totals[name], self.calls[name]) for name in self.totals}
+
+    def summary(self, workers=1):
+        wall = time.perf_counter() - self.started
+        rate = self.images / wall if wall else 0.0
+        lines = [f"Stage timings: {self.images} images in {wall:.2f} s ({rate:.1f} images/s)"
+                 + (f", stage times summed over {workers} worker processes" if workers > 1 else "")]
+        total = sum(self.totals.values()) or 1.0
+        lines.append(f"{'stage':<16}{'calls':>8}{'total s':>10}{'mean ms':>10}{'share':>8}")
+        for name in sorted(self.totals, key=self.totals.get, reverse=True):
+            seconds, calls = self.totals[name], self.calls[name]
+            lines.append(f"{name:<16}{calls:>8}{seconds:>10.3f}{seconds / calls * 1000:>10.2f}"
+                         f"{seconds / total:>8.1%}")
+        return "\n".join(lines)
+
+    def write_summary(self, stream, workers=1):
+        stream.write(self.summary(workers) + "\n")
+        stream.flush()
+
+
+# Function to check whether stage timing was asked for through the environment
+def requested():
+    return bool(os.environ.get(TIMING_ENV))
+
+
+# Function to turn stage timing on in this process (returns the timer that collects the stages)
+def start():
+    global active
+    active = StageTimer()
+    return active
+
+
+# Function to turn stage timing off again (returns the timer that was collecting)
+def stop():
+    global active
+    timer, active = active, None
+    return timer
+
+
+# Function to time one stage of the processing loops; does nothing unless timing was started
+@contextmanager
+def stage(name):
+    timer = active
+    if timer is None:
+        yield
+        return
+
+    children = timer.children()
+    children.append(0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timer.add(name, elapsed - children.pop())
+        children[-1] += elapsed
+
+
+# Function decorator that times every call of a function as one stage
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
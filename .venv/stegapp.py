@@ -0,0 +1,115 @@
+import argparse
+import os
+import sys
+from StegApi import make_images, analyze_images, revive_images, ReportWriter, MAKE_COLUMNS, ANALYZE_COLUMNS, \
+    ANALYZE_SCREEN_COLUMNS, REVIVE_COLUMNS, REVIVE_COMPRESS_LEVEL
+from StegScreen import SAMPLE_PIXELS, SUSPICIOUS_SCORE
+from StegBatch import default_workers
+from StegCache import ResultCache
+import StegTiming
+
+
+# Function to build the command-line parser (stegapp make|analyze|revive)
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stegapp", description="Headless StegMake, StegAnalyze and ImgRevive.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    make = commands.add_parser("make", help="hide random text in every image of a folder (StegMake)")
+    make.add_argument("images", help="folder with the source images")
+    make.add_argument("output", help="folder for the images with hidden text")
+    make.add_argument("--start", type=int, default=1, help="starting number for renaming (default: 1)")
+
+    analyze = commands.add_parser("analyze", help="look for hidden text in every image of a folder (StegAnalyze)")
+    analyze.add_argument("images", help="folder with the images to analyze")
+    analyze.add_argument("--screen", action="store_true",
+                         help="RS-analysis pre-screen; only suspicious images get the full legacy extraction")
+    analyze.add_argument("--sample-pixels", type=int, default=SAMPLE_PIXELS,
+                         help=f"pixels sampled by the pre-screen (default: {SAMPLE_PIXELS})")
+    analyze.add_argument("--threshold", type=float, default=SUSPICIOUS_SCORE,
+                         help=f"pre-screen score (estimated embedding rate, 0-1) that marks an image as suspicious "
+                              f"(default: {SUSPICIOUS_SCORE})")
+
+    revive = commands.add_parser("revive", help="clean hidden data from every image of a folder (ImgRevive)")
+    revive.add_argument("images", help="folder with the images to clean")
+    revive.add_argument("output", help="folder for the cleaned images")
+    revive.add_argument("--payload-rows-only", action="store_true",
+                        help="clean only the rows that carry the payload instead of the whole red channel")
+    revive.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        default=REVIVE_COMPRESS_LEVEL,
+                        help=f"PNG compression level for cleaned images (lower is faster but larger, "
+                             f"default: {REVIVE_COMPRESS_LEVEL})")
+
+    for command in (make, analyze, revive):
+        command.add_argument("--report", default="-",
+                             help="report file (.csv, .jsonl or .xlsx); JSON Lines on stdout by default")
+        command.add_argument("--format", choices=("csv", "jsonl", "xlsx"),
+                             help="report format (default: guessed from the report file extension)")
+        command.add_argument("--workers", type=int, default=default_workers(),
+                             help="worker processes (default: number of CPUs)")
+        command.add_argument("--timing", action="store_true",
+                             help=f"print per-stage timings to stderr after the run (or set {StegTiming.TIMING_ENV}=1)")
+    for command in (analyze, revive):
+        command.add_argument("--no-legacy", dest="legacy", action="store_false",
+                             help="skip the fallback scan for old EOF-marker messages")
+        command.add_argument("--cache", help="SQLite result cache; unchanged images are answered from it")
+        command.add_argument("--cache-max-age", type=float, metavar="DAYS",
+                             help="after the run, drop cache entries not seen for this many days")
+    return parser
+
+
+# Function to run one command and stream its report (returns the process exit code)
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    for folder in [args.images] + ([args.output] if args.command != "analyze" else []):
+        if not os.path.isdir(folder):
+            print(f"stegapp: error: invalid folder path: {folder}", file=sys.stderr)
+            return 2
+    if args.format == "xlsx" and args.report == "-":
+        print("stegapp: error: xlsx reports need a --report file", file=sys.stderr)
+        return 2
+    if args.command == "analyze" and args.sample_pixels < 1:
+        print("stegapp: error: --sample-pixels must be at least 1", file=sys.stderr)
+        return 2
+    if args.command == "analyze" and not 0 <= args.threshold <= 1:
+        print("stegapp: error: --threshold must be between 0 and 1", file=sys.stderr)
+        return 2
+
+    if args.timing or StegTiming.requested():
+        StegTiming.start()
+    cache = ResultCache(args.cache) if getattr(args, "cache", None) else None
+    if args.command == "make":
+        rows, columns = make_images(args.images, args.output, args.start, args.workers), MAKE_COLUMNS
+    elif args.command == "analyze":
+        rows = analyze_images(args.images, args.legacy, args.workers, cache=cache, screen=args.screen,
+                              sample_pixels=args.sample_pixels, threshold=args.threshold)
+        columns = ANALYZE_SCREEN_COLUMNS if args.screen else ANALYZE_COLUMNS
+    else:
+        rows = revive_images(args.images, args.output, args.legacy, args.workers, cache=cache,
+                             payload_rows_only=args.payload_rows_only, compress_level=args.compress_level)
+        columns = REVIVE_COLUMNS
+
+    failed = 0
+    try:
+        with ReportWriter(args.report, columns, args.format) as report:
+            for row in rows:
+                report.write(row)
+                if row["error"]:
+                    failed += 1
+                    print(f"{row['image']}: {row['error']}", file=sys.stderr)
+        if cache is not None and args.cache_max_age is not None:
+            cache.compact(args.cache_max_age * 86400)
+    finally:
+        # Results stored so far are kept, so an interrupted run resumes where it stopped
+        if cache is not None:
+            cache.close()
+        timer = StegTiming.stop()
+        if timer is not None:
+            timer.write_summary(sys.stderr, args.workers)
+
+    return 1 if failed else 0
+
+
+# Main
+if __name__ == "__main__":
+    sys.exit(main())
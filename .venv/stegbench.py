@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from StegApi import hide_text_in_image, extract_text_from_image, check_hidden_data, clean_hidden_data, make_images, \
+    analyze_images, revive_images, ReportWriter, HIDDEN_TEXT_LENGTH, MAKE_COLUMNS, ANALYZE_COLUMNS
+from StegBatch import default_workers
+from StegCore import HEADER_BITS
+import StegTiming
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage, peak RSS is reported as missing
+    resource = None
+
+# Default benchmark matrix
+RESOLUTIONS = "640x480,1920x1080,4000x3000"
+FORMATS = "png,jpg"
+DENSITIES = "0,0.001,0.5"  # Share of the red-channel LSBs carrying payload (0 = clean images)
+OPERATIONS = ("hide", "extract", "check", "clean", "make", "analyze", "revive")
+
+# Formats that keep LSBs intact (payloads can only be benchmarked in these)
+LOSSLESS_FORMATS = ('png',)
+
+# Quality of the synthetic JPEG covers
+JPEG_QUALITY = 90
+
+# Report columns as (header, row key) pairs
+BENCH_COLUMNS = [("Resolution", "resolution"), ("Format", "format"), ("Density", "density"),
+                 ("Operation", "operation"), ("Images", "images"), ("Workers", "workers"), ("Seconds", "seconds"),
+                 ("Images/s", "images_per_s"), ("MP/s", "mp_per_s"), ("Peak RSS (MB)", "peak_rss_mb"),
+                 ("Worker Peak RSS (MB)", "worker_peak_rss_mb"), ("Status", "status")]
+
+
+# Function to parse a comma separated list of WIDTHxHEIGHT resolutions
+def parse_resolutions(value):
+    try:
+        return [tuple(int(side) for side in item.lower().split('x')) for item in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid resolution list: {value}")
+
+
+# Function to build the command-line parser
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stegbench",
+                                     description="Benchmark the LSB tools on synthetic image corpora.")
+    parser.add_argument("--resolutions", type=parse_resolutions, default=parse_resolutions(RESOLUTIONS),
+                        help=f"WIDTHxHEIGHT list (default: {RESOLUTIONS})")
+    parser.add_argument("--formats", default=FORMATS, help=f"cover image formats (default: {FORMATS})")
+    parser.add_argument("--densities", default=DENSITIES,
+                        help=f"payload share of the pixel capacity, 0 for clean images (default: {DENSITIES})")
+    parser.add_argument("--operations", default=",".join(OPERATIONS),
+                        help=f"operations to run (default: {','.join(OPERATIONS)})")
+    parser.add_argument("--images", type=int, default=4, help="images per corpus (default: 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest counts (default: 3)")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes for the batch operations (default: number of CPUs)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic corpora (default: 0)")
+    parser.add_argument("--corpus", help="folder for the corpora, reused between runs (default: a temporary folder)")
+    parser.add_argument("--report", help="also write the results to a .csv, .jsonl or .xlsx file")
+    parser.add_argument("--baseline", help="JSON Lines report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown or RSS growth against the baseline (default: 0.15)")
+    parser.add_argument("--timing", action="store_true", help="print per-stage timings of every case to stderr")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)  # Internal: run one case in this process
+    return parser
+
+
+# Function to draw a photo-like cover image (smooth gradients plus sensor noise), the same for the same seed
+def synthetic_image(width, height, seed):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    channels = []
+    for offset, slope in zip(rng.uniform(20, 80, 3), rng.uniform(60, 150, 3)):
+        channel = offset + slope * (x * 0.7 + y * 0.3) + 25 * np.sin(6 * x + 4 * y + offset)
+        channels.append(channel + rng.normal(0, 4, (height, width)).astype(np.float32))
+    return Image.fromarray(np.clip(np.dstack(channels), 0, 255).astype(np.uint8), 'RGB')
+
+
+# Function to draw the text hidden in a corpus image: density share of its capacity, or StegMake's length for 0
+def payload_text(width, height, density, seed):
+    length = max(1, int(density * width * height) // 8 - HEADER_BITS // 8) if density else HIDDEN_TEXT_LENGTH
+    rng = random.Random(seed)
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
+
+# Function to create (or reuse) one corpus and return its folders.
+# covers/ holds the synthetic images, input/ the images the read-side operations work on (covers with the payload
+# hidden in them, or the covers themselves for clean corpora).
+def build_corpus(root, width, height, image_format, density, count, seed):
+    folder = os.path.join(root, f"{width}x{height}-{image_format}-d{density}-s{seed}")
+    covers = os.path.join(folder, "covers")
+    inputs = os.path.join(folder, "input") if density else covers
+    os.makedirs(covers, exist_ok=True)
+    os.makedirs(inputs, exist_ok=True)
+
+    for i in range(count):
+        cover = os.path.join(covers, f"img_{i:03d}.{image_format}")
+        if not os.path.exists(cover):
+            image = synthetic_image(width, height, [seed, width, height, i])
+            if image_format == 'jpg':
+                image.save(cover, quality=JPEG_QUALITY)
+            else:
+                image.save(cover)
+        stego = os.path.join(inputs, f"img_{i:03d}.png")
+        if density and not os.path.exists(stego):
+            hide_text_in_image(cover, payload_text(width, height, density, f"{seed}-{i}"), stego)
+    return folder, covers, inputs
+
+
+# Function to read the peak resident set size of this process and of its largest finished child, in MB
+def peak_rss():
+    if resource is None:
+        return None, None
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is in bytes on macOS, in KB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2 ** 20
+
+    # Linux carries ru_maxrss over from the parent through exec; VmHWM starts over with the new program
+    try:
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+    except (OSError, StopIteration):
+        pass
+    return round(own, 1), round(children, 1) if children else None
+
+
+# Function to run one operation over a corpus once
+def run_operation(case, output):
+    width, height = case["resolution"]
+    covers, inputs, workers = case["covers"], case["inputs"], case["workers"]
+    operation = case["operation"]
+
+    if operation == "hide":
+        text = payload_text(width, height, case["density"], case["seed"])
+        for name in sorted(os.listdir(covers)):
+            hide_text_in_image(os.path.join(covers, name), text, os.path.join(output, os.path.splitext(name)[0]
+                                                                               + ".png"))
+    elif operation == "extract":
+        for name in sorted(os.listdir(inputs)):
+            extract_text_from_image(os.path.join(inputs, name))
+    elif operation == "check":
+        for name in sorted(os.listdir(inputs)):
+            check_hidden_data(os.path.join(inputs, name))
+    elif operation == "clean":
+        for name in sorted(os.listdir(inputs)):
+            clean_hidden_data(os.path.join(inputs, name), os.path.join(output, os.path.splitext(name)[0] + ".png"))
+    elif operation == "make":
+        with ReportWriter(os.path.join(output, "make.xlsx"), MAKE_COLUMNS) as report:
+            for row in make_images(covers, output, workers=workers):
+                report.write(row)
+    elif operation == "analyze":
+        with ReportWriter(os.path.join(output, "analyze.xlsx"), ANALYZE_COLUMNS) as report:
+            for row in analyze_images(inputs, workers=workers):
+                report.write(row)
+    elif operation == "revive":
+        for _ in revive_images(inputs, output, workers=workers):
+            pass
+
+
+# Function to run one case in this process: the fastest of the repeats counts, peak RSS covers all of them
+def run_case(case):
+    images = len(os.listdir(case["covers"] if case["operation"] in ("hide", "make") else case["inputs"]))
+    width, height = case["resolution"]
+    if case["timing"]:
+        StegTiming.start()
+
+    best = None
+    for _ in range(case["repeat"]):
+        output = tempfile.mkdtemp(prefix="stegbench-")
+        try:
+            started = time.perf_counter()
+            run_operation(case, output)
+            elapsed = time.perf_counter() - started
+        finally:
+            shutil.rmtree(output, ignore_errors=True)
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {"images": images, "seconds": round(best, 4), "images_per_s": round(images / best, 2),
+              "mp_per_s": round(images * width * height / 1e6 / best, 2)}
+    result["peak_rss_mb"], result["worker_peak_rss_mb"] = peak_rss()
+
+    timer = StegTiming.stop()
+    if timer is not None:
+        timer.images = images * case["repeat"]
+        sys.stderr.write(f"--- {width}x{height} {case['format']} density {case['density']} {case['operation']} "
+                         f"(all {case['repeat']} runs)\n")
+        timer.write_summary(sys.stderr, case["workers"] if case["operation"] in ("make", "analyze", "revive") else 1)
+        result["stages"] = {name: round(seconds, 4) for name, (seconds, _) in timer.stages().items()}
+    return result
+
+
+# Function to run one case in a fresh interpreter, so its peak RSS isn't inflated by earlier cases
+def run_case_isolated(case):
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", json.dumps(case)],
+                               stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        return {"error": f"case exited with code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# Function to list the benchmark cases, skipping payloads in formats that would destroy them
+def plan_cases(args, root):
+    formats = [image_format.strip().lower() for image_format in args.formats.split(',')]
+    densities = [float(density) for density in args.densities.split(',')]
+    operations = [operation.strip() for operation in args.operations.split(',')]
+    for operation in operations:
+        if operation not in OPERATIONS:
+            raise ValueError(f"unknown operation: {operation}")
+
+    for width, height in args.resolutions:
+        for image_format in formats:
+            for density in densities:
+                if density and image_format not in LOSSLESS_FORMATS:
+                    continue
+                _, covers, inputs = build_corpus(root, width, height, image_format, density, args.images, args.seed)
+                for operation in operations:
+                    # make always hides StegMake's short text, so it only runs once per cover set
+                    if operation == "make" and density:
+                        continue
+                    yield {"resolution": [width, height], "format": image_format, "density": density,
+                           "operation": operation, "covers": covers, "inputs": inputs, "seed": args.seed,
+                           "workers": args.workers if operation in ("make", "analyze", "revive") else 1,
+                           "repeat": max(1, args.repeat), "timing": args.timing}
+
+
+# Function to key a result row for the baseline comparison
+def case_key(row):
+    return row["resolution"], row["format"], float(row["density"]), row["operation"], int(row["workers"])
+
+
+# Function to read the rows of an earlier JSON Lines report
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return {case_key(row): row for row in map(json.loads, f) if not row.get("error")}
+
+
+# Function to compare a result with its baseline row (returns the regressions found)
+def regressions(row, baseline, tolerance):
+    found = []
+    if row["images_per_s"] < baseline["images_per_s"] * (1 - tolerance):
+        found.append(f"throughput {baseline['images_per_s']} -> {row['images_per_s']} images/s")
+    if row.get("peak_rss_mb") and baseline.get("peak_rss_mb") and \
+            row["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        found.append(f"peak RSS {baseline['peak_rss_mb']} -> {row['peak_rss_mb']} MB")
+    return found
+
+
+# Function to run the benchmark matrix and print one line per case (returns the process exit code)
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    root = args.corpus or tempfile.mkdtemp(prefix="stegbench-corpus-")
+    report = ReportWriter(args.report, BENCH_COLUMNS) if args.report else None
+
+    failed = 0
+    print(f"{'case':<34}{'images/s':>10}{'MP/s':>10}{'peak MB':>10}{'workers MB':>12}  status")
+    try:
+        for case in plan_cases(args, root):
+            width, height = case["resolution"]
+            row = {"resolution": f"{width}x{height}", "format": case["format"], "density": case["density"],
+                   "operation": case["operation"], "workers": case["workers"]}
+            row.update(run_case_isolated(case))
+
+            if row.get("error"):
+                failed += 1
+                row["status"] = row["error"]
+            else:
+                found = regressions(row, baseline[case_key(row)], args.tolerance) \
+                    if case_key(row) in baseline else []
+                failed += bool(found)
+                row["status"], row["error"] = "; ".join(found) or "ok", None
+
+            label = f"{row['resolution']} {row['format']} d={row['density']} {row['operation']}"
+            print(f"{label:<34}{row.get('images_per_s', '-'):>10}{row.get('mp_per_s', '-'):>10}"
+                  f"{row.get('peak_rss_mb') or '-':>10}{row.get('worker_peak_rss_mb') or '-':>12}  {row['status']}",
+                  flush=True)
+            if report is not None:
+                report.write(row)
+    finally:
+        if report is not None:
+            report.close()
+        if not args.corpus:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return 1 if failed else 0
+
+
+# Main
+if __name__ == "__main__":
+    sys.exit(main())